@@ -1,12 +1,10 @@
 #!/usr/bin/env python3
 
 import os
-import requests
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime, timedelta
-from ipytv import playlist
-from ipytv.playlist import M3UPlaylist
 import config
+from app.m3u import download_m3u_file, iter_m3u, select_channels, write_m3u
 
 def extract_credentials(url):
     """
@@ -30,10 +28,7 @@ def download_m3u(url, output_path):
     """
     Download the M3U file from a URL and save it to the specified path.
     """
-    response = requests.get(url)
-    response.raise_for_status()
-    with open(output_path, 'w', encoding='utf-8') as file:
-        file.write(response.text)
+    download_m3u_file(url, output_path, log=print)
 
 def is_download_needed(file_path, max_age_hours):
     if not os.path.exists(file_path):
@@ -60,38 +55,21 @@ if is_download_needed(original_m3u_path, config.maxage_before_download):
 else:
     print(f"Using existing M3U file: {original_m3u_path}")
 
-# Load the M3U file locally
+# Stream the M3U file locally, keeping only the pinned channels and whitelisted groups
 print("Loading the M3U playlist...")
-original_playlist = playlist.loadf(original_m3u_path)
+entries = iter_m3u(original_m3u_path, groups=set(config.desired_group_titles), names=set(config.target_channel_names))
 
-# Initialize an empty list to collect channels for the new playlist
-collected_channels = []
-
-# Process specific target channels
 print("Processing specific target channels...")
-for name in config.target_channel_names:
-    if any(channel.name == name for channel in original_playlist):
-        channel = next((channel for channel in original_playlist if channel.name == name), None)
-        channel.attributes['group-title'] = config.new_group_title
-        collected_channels.append(channel)
-        print(f'Added "{name}" to new group "{config.new_group_title}".')
+collected_channels, added_targets = select_channels(entries, config.target_channel_names, config.desired_group_titles, config.new_group_title)
+for name in added_targets:
+    print(f'Added "{name}" to new group "{config.new_group_title}".')
 
-# Process channels by desired group titles
 print("Filtering channels by desired group titles...")
-for group_title in config.desired_group_titles:
-    for channel in original_playlist:
-        if channel.attributes.get('group-title') == group_title and channel not in collected_channels:
-            collected_channels.append(channel)
-            print(f'Included "{channel.name}" from group "{group_title}".')
+for channel in collected_channels[len(added_targets):]:
+    print(f'Included "{channel.name}" from group "{channel.attributes.get("group-title")}".')
 
 print(f"Total channels to be included in the new playlist: {len(collected_channels)}")
 
-# Create a new playlist with the collected channels
-new_playlist = M3UPlaylist()
-new_playlist.append_channels(collected_channels)
-
 # Export the new playlist
-with open(output_path, 'w', encoding='utf-8') as file:
-    content = new_playlist.to_m3u_plus_playlist()
-    file.write(content)
+write_m3u(output_path, collected_channels)
 print(f'Exported the filtered and curated playlist to {output_path}')
@@ -0,0 +1,496 @@
+"""Process-wide in-memory store for the VOD catalogue caches.
+
+Each catalogue is stored on disk as a compact SQLite file (movies_cache.sqlite,
+series_cache.sqlite) holding one row per title and only the columns M3Usort
+uses; the provider's other fields are dropped when the list is ingested. A
+reader that only needs a few columns (``columns()``, ``listing``, ``count``)
+selects just those, without loading the full records. ``iter_json()`` and
+``export_json()`` write the catalogue back out as a JSON list in chunks, and a
+legacy movies_cache.json / series_cache.json is imported automatically the
+first time it is needed (and then renamed to ``*.migrated``).
+
+The full records are loaded into memory on first use together with the views
+the routes need (the page rows, the category list and the recent additions
+ordered newest first), plus a primary-key index so a single title is an O(1)
+dict lookup. IDs are normalised to strings, so ``42`` and ``"42"`` find the
+same record.
+
+A lookup only stats the file; the records are re-read when its mtime or size
+changes on disk. Writers in this process go through ``replace()``,
+``update_item()`` and ``save()``, which keep the views and the index current
+without a reload, or ``write_stream()``, which writes a fresh list record by
+record without holding it in memory.
+
+``page()`` serves the /movies and /series pages one window at a time: the
+rows matching a category and search filter are found once per catalogue
+``version`` and sort order, memoised, and then only sliced, so paging through
+a filtered list does not re-scan the catalogue.
+
+The returned lists are shared between requests and must be treated as
+read-only.
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+
+from .jsonstream import iter_json_array
+
+
+LEGACY_CHUNK_SIZE = 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+QUERY_CACHE_SIZE = 32
+SORTS = ('', 'name', 'name_desc', 'newest')
+
+
+class _Snapshot:
+    __slots__ = ('stamp', 'items', 'rows', 'categories', 'recent', 'positions')
+
+    def __init__(self, stamp, items, rows, categories, recent, positions):
+        self.stamp = stamp
+        self.items = items
+        self.rows = rows
+        self.categories = categories
+        self.recent = recent
+        self.positions = positions
+
+
+_EMPTY = _Snapshot(None, [], [], [], [], {})
+
+
+def catalogue_key(item_id):
+    """Normalise a provider id (int, numeric string or other) to a dict key."""
+    try:
+        return str(int(item_id))
+    except (TypeError, ValueError):
+        return str(item_id)
+
+
+def _column_value(value):
+    # SQLite stores scalars; the odd nested provider value is kept as JSON text
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+def first_of(item, *names):
+    """Return the first non-empty value among ``names`` in ``item``, or ''."""
+    for name in names:
+        if item.get(name):
+            return item[name]
+    return ''
+
+
+class VodCatalogue(ABC):
+    """Base class; subclasses define the id field, the stored columns and how a record is projected into each view."""
+    id_field = None
+    fields = ()
+    listing_fields = ()
+    page_fields = ()
+
+    def __init__(self, cache_path, legacy_path=None):
+        self.cache_path = cache_path
+        self.legacy_path = legacy_path
+        self._lock = threading.RLock()
+        self._snapshot = _EMPTY
+        self._projections = (None, {})
+        self._dirty = set()
+        self._revision = 0
+        self._queries = OrderedDict()
+
+    def exists(self):
+        return os.path.exists(self.cache_path) or self._migrate_legacy()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.cache_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    # Storage
+
+    def _connect(self, path=None, readonly=True):
+        if readonly:
+            return sqlite3.connect(f'file:{path or self.cache_path}?mode=ro', uri=True)
+        return sqlite3.connect(path or self.cache_path)
+
+    def _select(self, columns):
+        connection = self._connect()
+        try:
+            cursor = connection.execute(f"SELECT {', '.join(columns)} FROM items ORDER BY position")
+            return [dict(zip(columns, row)) for row in cursor]
+        finally:
+            connection.close()
+
+    def _write_file(self, records):
+        """Write projected ``records`` to a fresh file and atomically swap it in. Returns the count."""
+        tmp_path = f'{self.cache_path}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        count = 0
+
+        def rows():
+            nonlocal count
+            for record in records:
+                yield (count,) + tuple(_column_value(record.get(field)) for field in self.fields)
+                count += 1
+
+        try:
+            connection = self._connect(tmp_path, readonly=False)
+            try:
+                connection.execute(f"CREATE TABLE items (position INTEGER PRIMARY KEY, {', '.join(self.fields)})")
+                placeholders = ', '.join('?' * (len(self.fields) + 1))
+                connection.executemany(f"INSERT INTO items VALUES ({placeholders})", rows())
+                connection.commit()
+            finally:
+                connection.close()
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def _migrate_legacy(self):
+        """Import a legacy JSON cache into the SQLite store; returns True if one was imported.
+
+        The imported file is renamed to ``*.migrated``, so a later loss of the
+        SQLite file does not silently bring back the old catalogue.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return False
+        with self._lock:
+            if os.path.exists(self.cache_path):
+                return True
+            with open(self.legacy_path, 'rb') as f:
+                self.write_stream(iter_json_array(iter(lambda: f.read(LEGACY_CHUNK_SIZE), b'')))
+            os.replace(self.legacy_path, f'{self.legacy_path}.migrated')
+        return True
+
+    # In-memory snapshot
+
+    def _current(self):
+        stamp = self._file_stamp()
+        snapshot = self._snapshot
+        if stamp is not None and stamp == snapshot.stamp:
+            return snapshot
+        with self._lock:
+            if stamp is None and self._migrate_legacy():
+                stamp = self._file_stamp()
+            if stamp != self._snapshot.stamp:
+                if stamp is None:
+                    self._snapshot = _EMPTY
+                else:
+                    self._snapshot = self._build(stamp, self._select(self.fields))
+                self._dirty.clear()
+                self._revision += 1
+            return self._snapshot
+
+    def _build(self, stamp, items):
+        rows = [self.row(item) for item in items]
+        categories = sorted(set(row['category'] for row in rows if row['category']))
+        recent = []
+        for item in items:
+            try:
+                added = int(self.added(item) or 0)
+            except (TypeError, ValueError):
+                continue
+            if added:
+                entry = self.recent_entry(item)
+                entry['added'] = added
+                recent.append(entry)
+        recent.sort(key=lambda x: x['added'], reverse=True)
+        positions = {}
+        for position, item in enumerate(items):
+            positions.setdefault(catalogue_key(item.get(self.id_field)), position)
+        return _Snapshot(stamp, items, rows, categories, recent, positions)
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = _EMPTY
+            self._projections = (None, {})
+            self._dirty.clear()
+            self._revision += 1
+
+    def project(self, item):
+        """Reduce a provider record to the stored columns."""
+        return {field: item.get(field) for field in self.fields}
+
+    # Column projection
+
+    def columns(self, *names):
+        """Return ``[{name: value}, ...]`` for the requested columns only, in catalogue order.
+
+        Served from the in-memory records when they are loaded and current,
+        otherwise read straight from disk without loading the full records.
+        """
+        stamp = self._file_stamp()
+        if stamp is None:
+            if not self._migrate_legacy():
+                return []
+            stamp = self._file_stamp()
+        with self._lock:
+            projection_stamp, projections = self._projections
+            if projection_stamp != stamp:
+                projections = {}
+                self._projections = (stamp, projections)
+            if names not in projections:
+                if self._snapshot.stamp == stamp:
+                    projections[names] = [{name: item.get(name) for name in names} for item in self._snapshot.items]
+                else:
+                    projections[names] = self._select(names)
+            return projections[names]
+
+    # Records
+
+    def get(self, item_id):
+        """Return the cached record for ``item_id``, or None."""
+        snapshot = self._current()
+        position = snapshot.positions.get(catalogue_key(item_id))
+        return snapshot.items[position] if position is not None else None
+
+    def update_item(self, item_id, fields):
+        """Merge ``fields`` into one record in memory, keeping its page row in sync.
+
+        Call ``save()`` to persist the change.
+        """
+        self._current()
+        with self._lock:
+            snapshot = self._snapshot
+            position = snapshot.positions.get(catalogue_key(item_id))
+            if position is None:
+                return False
+            item = snapshot.items[position]
+            item.update((key, value) for key, value in fields.items() if key in self.fields)
+            snapshot.rows[position] = self.row(item)
+            self._dirty.add(position)
+            self._revision += 1
+            return True
+
+    def replace(self, items):
+        """Swap in a freshly fetched item list and write it to disk."""
+        items = [self.project(item) for item in items]
+        with self._lock:
+            self._write_file(items)
+            self._snapshot = self._build(self._file_stamp(), items)
+            self._projections = (None, {})
+            self._dirty.clear()
+            self._revision += 1
+
+    def write_stream(self, items):
+        """Write an iterable of records to the cache file as they arrive, then drop the in-memory copy.
+
+        Only one record is held at a time; the views are rebuilt from the file
+        on the next lookup. If ``items`` raises, the previous cache file is kept.
+        Returns the number of records written.
+        """
+        with self._lock:
+            count = self._write_file(self.project(item) for item in items)
+            self._snapshot = _EMPTY
+            self._projections = (None, {})
+            self._dirty.clear()
+            self._revision += 1
+        return count
+
+    def save(self):
+        """Write the records changed by ``update_item()`` to the cache file."""
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._dirty or snapshot.stamp is None:
+                return
+            assignments = ', '.join(f'{field} = ?' for field in self.fields)
+            connection = self._connect(readonly=False)
+            try:
+                connection.executemany(
+                    f"UPDATE items SET {assignments} WHERE position = ?",
+                    ([_column_value(snapshot.items[position].get(field)) for field in self.fields] + [position]
+                     for position in sorted(self._dirty)))
+                connection.commit()
+            finally:
+                connection.close()
+            self._dirty.clear()
+            snapshot.stamp = self._file_stamp()
+
+    def iter_json(self, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield the catalogue as a JSON list of records, in text chunks of about ``chunk_size`` characters."""
+        parts = ['[']
+        size = 1
+        for position, item in enumerate(self.items):
+            part = json.dumps(item)
+            parts.append(f', {part}' if position else part)
+            size += len(parts[-1])
+            if size >= chunk_size:
+                yield ''.join(parts)
+                parts = []
+                size = 0
+        parts.append(']')
+        yield ''.join(parts)
+
+    def export_json(self, file):
+        """Write the catalogue to the open text ``file`` as a JSON list of records."""
+        for chunk in self.iter_json():
+            file.write(chunk)
+
+    @property
+    def items(self):
+        """The stored records."""
+        return self._current().items
+
+    @property
+    def count(self):
+        stamp = self._file_stamp()
+        if stamp is not None and stamp == self._snapshot.stamp:
+            return len(self._snapshot.items)
+        if stamp is None and not self._migrate_legacy():
+            return 0
+        connection = self._connect()
+        try:
+            return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            connection.close()
+
+    @property
+    def listing(self):
+        return [self.listing_entry(item) for item in self.columns(*self.listing_fields)]
+
+    @property
+    def rows(self):
+        return self._current().rows
+
+    @property
+    def categories(self):
+        return self._current().categories
+
+    @property
+    def version(self):
+        """An opaque value that changes whenever the page rows may have changed; used for ETags."""
+        snapshot = self._current()
+        return f'{snapshot.stamp[0]:x}-{snapshot.stamp[1]:x}-{self._revision}' if snapshot.stamp else 'empty'
+
+    def query(self, category='', search='', sort=''):
+        """Return the positions of the rows in ``category`` whose name contains every word of ``search``.
+
+        ``sort`` is one of ``SORTS``: catalogue order, name A-Z or Z-A, or newest
+        first. Results are memoised per catalogue version.
+        """
+        words = tuple(search.lower().split())
+        with self._lock:
+            snapshot = self._current()
+            key = (self._revision, category, words, sort)
+            positions = self._queries.get(key)
+            if positions is not None:
+                self._queries.move_to_end(key)
+                return positions
+            rows = snapshot.rows
+            positions = [position for position, row in enumerate(rows)
+                         if (not category or row['category'] == category)
+                         and all(word in (row['name'] or '').lower() for word in words)]
+            if sort in ('name', 'name_desc'):
+                positions.sort(key=lambda position: (rows[position]['name'] or '').lower(), reverse=sort == 'name_desc')
+            elif sort == 'newest':
+                positions.sort(key=lambda position: self._added_key(snapshot.items[position]), reverse=True)
+            self._queries[key] = positions
+            while len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+            return positions
+
+    def page(self, offset=0, limit=120, category='', search='', sort=''):
+        """Return ``{'total': n, 'items': [...]}`` for one window of the filtered, sorted rows.
+
+        Items carry only ``page_fields``; details such as the plot are fetched per title.
+        """
+        with self._lock:
+            positions = self.query(category, search, sort)
+            rows = self._snapshot.rows
+            items = [{field: rows[position][field] for field in self.page_fields}
+                     for position in positions[offset:offset + limit]]
+        return {'total': len(positions), 'items': items}
+
+    def _added_key(self, item):
+        try:
+            return int(self.added(item) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def recent(self, since_date):
+        """Return entries added on or after ``since_date``, newest first."""
+        result = []
+        for entry in self._current().recent:
+            if datetime.fromtimestamp(entry['added']).date() < since_date:
+                break
+            result.append(entry)
+        return result
+
+    # Projections, implemented by subclasses
+
+    @abstractmethod
+    def listing_entry(self, item):
+        """The ``listing`` view of a record."""
+
+    @abstractmethod
+    def row(self, item):
+        """The ``rows`` (page) view of a record."""
+
+    @abstractmethod
+    def recent_entry(self, item):
+        """The ``recent`` view of a record, without its ``added`` timestamp."""
+
+    @abstractmethod
+    def added(self, item):
+        """The timestamp ``recent`` orders a record by, or None."""
+
+
+class MoviesCatalogue(VodCatalogue):
+    id_field = 'stream_id'
+    fields = ('stream_id', 'name', 'stream_icon', 'category_name', 'added',
+              'tmdb_id', 'imdb_id', 'plot', 'rating', 'normalized_name')
+    listing_fields = ('name', 'stream_id', 'normalized_name')
+    page_fields = ('name', 'stream_id', 'stream_icon', 'category')
+
+    def project(self, m):
+        return {'stream_id': m.get('stream_id'), 'name': m.get('name'), 'stream_icon': m.get('stream_icon', ''),
+                'category_name': m.get('category_name', ''), 'added': m.get('added'),
+                'tmdb_id': first_of(m, 'tmdb_id', 'tmdb'), 'imdb_id': first_of(m, 'imdb_id', 'imdb'),
+                'plot': first_of(m, 'plot', 'description', 'overview'), 'rating': first_of(m, 'rating', 'rating_5based'),
+                'normalized_name': m.get('normalized_name')}
+
+    def listing_entry(self, m):
+        return {'name': m['name'], 'stream_id': m['stream_id'], 'normalized_name': m.get('normalized_name')}
+
+    def row(self, m):
+        return {'name': m['name'], 'stream_id': m['stream_id'], 'stream_icon': m.get('stream_icon') or '', 'category': m.get('category_name') or '', 'tmdb_id': m.get('tmdb_id') or '', 'imdb_id': m.get('imdb_id') or '', 'plot': m.get('plot') or '', 'rating': m.get('rating') or ''}
+
+    def recent_entry(self, m):
+        return {'name': m['name'], 'stream_id': m['stream_id'], 'stream_icon': m.get('stream_icon') or ''}
+
+    def added(self, m):
+        return m.get('added')
+
+
+class SeriesCatalogue(VodCatalogue):
+    id_field = 'series_id'
+    fields = ('series_id', 'name', 'cover', 'category_name', 'last_modified', 'added',
+              'tmdb_id', 'imdb_id', 'plot', 'rating', 'normalized_name')
+    listing_fields = ('name', 'series_id', 'cover', 'last_modified', 'normalized_name')
+    page_fields = ('name', 'series_id', 'series_cover', 'category')
+
+    def project(self, s):
+        return {'series_id': s.get('series_id'), 'name': s.get('name'), 'cover': s.get('cover', ''),
+                'category_name': s.get('category_name', ''), 'last_modified': s.get('last_modified'), 'added': s.get('added'),
+                'tmdb_id': first_of(s, 'tmdb_id', 'tmdb'), 'imdb_id': first_of(s, 'imdb_id', 'imdb'),
+                'plot': first_of(s, 'plot', 'description', 'overview'), 'rating': first_of(s, 'rating', 'rating_5based'),
+                'normalized_name': s.get('normalized_name')}
+
+    def listing_entry(self, s):
+        return {'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover') or '', 'last_modified': s.get('last_modified'), 'normalized_name': s.get('normalized_name')}
+
+    def row(self, s):
+        return {'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover') or '', 'category': s.get('category_name') or '', 'tmdb_id': s.get('tmdb_id') or '', 'imdb_id': s.get('imdb_id') or '', 'plot': s.get('plot') or '', 'rating': s.get('rating') or ''}
+
+    def recent_entry(self, s):
+        return {'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover') or ''}
+
+    def added(self, s):
+        return s.get('last_modified') or s.get('added')
@@ -0,0 +1,109 @@
+"""In-process cache of the parsed config.py.
+
+config.py is executed once and the resulting namespace is kept in memory.
+Every lookup stats the file and only re-executes it when its mtime, inode or
+size changed, so cheap routes no longer pay for a read + exec() per variable.
+
+Writes go through ``update()``, which applies any number of variable and array
+changes in a single render of the file, then fsyncs a temp file and renames it
+over config.py, so a crash can never leave a half-updated config behind.
+"""
+import copy
+import os
+import threading
+
+
+class ConfigStore:
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._namespace = {}
+        self._stamp = None
+
+    def _file_stamp(self):
+        st = os.stat(self.config_path)
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def namespace(self):
+        """Return the parsed config namespace, re-reading config.py only if it changed on disk."""
+        stamp = self._file_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.config_path, 'r') as file:
+                    config_content = file.read()
+                config_namespace = {}
+                exec(config_content, {}, config_namespace)
+                self._namespace = config_namespace
+                self._stamp = stamp
+            return self._namespace
+
+    def get(self, name, default=None):
+        """Return a config value. Lists and dicts are copied so callers may mutate them freely."""
+        value = self.namespace().get(name, default)
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._stamp = None
+
+    def update(self, variables=None, arrays=None):
+        """Apply variable and array changes to config.py in one atomic rewrite."""
+        with self._write_lock:
+            with open(self.config_path, 'r') as file:
+                lines = file.readlines()
+            content = render_config(lines, variables or {}, arrays or {})
+
+            tmp_path = f'{self.config_path}.tmp'
+            with open(tmp_path, 'w') as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(tmp_path, os.stat(self.config_path).st_mode & 0o777)
+            os.replace(tmp_path, self.config_path)
+            self.invalidate()
+
+
+def render_config(lines, variables, arrays):
+    """Return config.py content with ``variables`` and ``arrays`` replaced or appended."""
+    output = []
+    found = set()
+    skipping_array = False
+
+    for line in lines:
+        stripped = line.strip()
+        if skipping_array:
+            if stripped == ']':
+                skipping_array = False
+            continue
+
+        array_name = next((name for name in arrays if stripped.startswith(f'{name} = [')), None)
+        if array_name is not None:
+            output.extend(_render_array(array_name, arrays[array_name]))
+            found.add(array_name)
+            skipping_array = not stripped.endswith(']')
+            continue
+
+        variable_name = next((name for name in variables if stripped.startswith(f'{name} =')), None)
+        if variable_name is not None:
+            output.append(f'{variable_name} = "{variables[variable_name]}"\n')
+            found.add(variable_name)
+            continue
+
+        output.append(line)
+
+    if output and not output[-1].endswith('\n'):
+        output[-1] += '\n'
+    for name, value in variables.items():
+        if name not in found:
+            output.append(f'{name} = "{value}"\n')
+    for name, values in arrays.items():
+        if name not in found:
+            output.extend(_render_array(name, values))
+    return ''.join(output)
+
+
+def _render_array(name, values):
+    return [f'{name} = [\n'] + [f'    "{value}",\n' for value in values] + [']\n']
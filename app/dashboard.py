@@ -0,0 +1,49 @@
+"""Short-lived memoisation for the dashboard snapshot.
+
+The dashboard is rebuilt on every page view and on every 60s poll of each
+open tab, but most of what it shows changes far more slowly than that: the
+host's internal IP, the title counts of the VOD catalogues and the mtimes of
+the playlist files. ``ttl_cache`` keeps such values for a few seconds or
+minutes, so a dashboard tick is a handful of dict lookups.
+"""
+import threading
+import time
+from functools import wraps
+
+
+def ttl_cache(seconds):
+    """Cache a function's result per positional arguments for ``seconds``.
+
+    The wrapped function gains ``cache_clear()``. Concurrent callers may both
+    compute an expired value; the last one stored wins.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(args)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            value = func(*args)
+            with lock:
+                cache[args] = (now + seconds, value)
+            return value
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def format_hhmm(total_seconds):
+    """Format a duration as ``HH:MM``."""
+    hours, remainder = divmod(int(total_seconds), 3600)
+    minutes, _ = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}"
@@ -0,0 +1,104 @@
+"""Concurrent, rate-limited enrichment of the VOD catalogue.
+
+Items missing TMDB data are fetched from the provider by a bounded pool of
+worker threads that share one pooled HTTP session. A token-bucket limiter
+caps the request rate so the provider does not ban the account, and the
+enriched records are checkpointed to disk every ``checkpoint_every`` items, so
+an interrupted run resumes where it left off (already enriched items are no
+longer selected).
+
+The limiter counts the requests the workers start, not the session's own
+retries of a failed one: those only follow an error or a 429, are capped per
+request and are spaced by the retry back-off (which honours Retry-After), so
+they slow a struggling provider down rather than adding to a burst.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .pool import imap_bounded
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_LIMIT = 10  # requests per second
+DEFAULT_CHECKPOINT = 500  # items between checkpoints
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing ``rate`` acquisitions per second."""
+
+    def __init__(self, rate):
+        self.rate = float(rate) if rate else 0
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last = time.monotonic()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def enrichment_fields(info):
+    """Map a provider ``info`` block to the fields stored in the catalogue."""
+    return {
+        'tmdb_id': info.get('tmdb_id') or info.get('tmdb') or '',
+        'imdb_id': info.get('imdb_id') or info.get('imdb') or '',
+        'plot':    info.get('plot') or info.get('description') or info.get('overview') or '',
+        'rating':  info.get('rating') or info.get('rating_5based') or '',
+    }
+
+
+def enrich_catalogue(catalogue, fetch_info, workers=DEFAULT_WORKERS, rate_limit=DEFAULT_RATE_LIMIT,
+                     checkpoint_every=DEFAULT_CHECKPOINT, log=logger.info, label='items'):
+    """Enrich every catalogue record that has neither a tmdb_id nor a plot.
+
+    ``fetch_info(item_id)`` returns the provider ``info`` dict or None; it is
+    called from worker threads. Results are applied on the calling thread.
+    Returns the number of enriched records.
+    """
+    pending = [item.get(catalogue.id_field) for item in catalogue.items if not item.get('tmdb_id') and not item.get('plot')]
+    if not pending:
+        return 0
+
+    workers = max(1, int(workers))
+    checkpoint_every = max(1, int(checkpoint_every))
+    limiter = RateLimiter(rate_limit)
+    log(f"Enriching {len(pending)} {label} ({workers} workers, {rate_limit or 'unlimited'} req/s)")
+
+    def task(item_id):
+        limiter.acquire()
+        try:
+            return item_id, fetch_info(item_id)
+        except Exception:
+            return item_id, None
+
+    enriched = since_checkpoint = 0
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item_id, info in imap_bounded(pool, task, pending, workers):
+            if info is None:
+                continue
+            catalogue.update_item(item_id, enrichment_fields(info))
+            enriched += 1
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                catalogue.save()
+                since_checkpoint = 0
+                log(f"Enrichment checkpoint: {enriched}/{len(pending)} {label} in {time.monotonic() - start:.0f}s")
+
+    if since_checkpoint:
+        catalogue.save()
+    return enriched
@@ -0,0 +1,86 @@
+"""Pluggable fuzzy scorers for matching wanted titles against the catalogue.
+
+A scorer scores one query against a whole list of names in a single call.
+The reference backend is fuzzywuzzy (the library M3Usort always used), which
+scores one pair at a time in Python. When the optional ``rapidfuzz`` package
+is installed, the ``rapidfuzz`` backend batch-scores the query against the
+full name array with ``process.cdist`` across all CPU cores. Names are
+pre-processed the way fuzzywuzzy does it (ASCII only, punctuation to spaces,
+lowercase), so both backends rank titles the same way.
+
+The backend is picked with the ``fuzzy_backend`` config value: ``fuzzywuzzy``
+(default), ``rapidfuzz``, or ``auto`` (rapidfuzz when it is installed).
+"""
+import re
+
+from fuzzywuzzy import fuzz
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+except ImportError:  # optional dependency
+    rf_fuzz = rf_process = None
+
+
+DEFAULT_BACKEND = 'fuzzywuzzy'
+_NON_WORD_RE = re.compile(r'(?ui)\W')
+
+
+def full_process(text):
+    """fuzzywuzzy's default pre-processing with force_ascii=True."""
+    text = ''.join(char for char in text if ord(char) < 128)
+    return _NON_WORD_RE.sub(' ', text).lower().strip()
+
+
+class FuzzywuzzyScorer:
+    """Reference backend: ``fuzz.<metric>`` for every name, one pair at a time."""
+    name = 'fuzzywuzzy'
+
+    def __init__(self, metric='token_set_ratio'):
+        self.metric = getattr(fuzz, metric)
+
+    def prepare(self, names):
+        return list(names)
+
+    def scores(self, query, prepared):
+        metric = self.metric
+        return [metric(query, name) for name in prepared]
+
+
+class RapidfuzzScorer:
+    """Batch backend: one ``rapidfuzz.process.cdist`` call per query."""
+    name = 'rapidfuzz'
+
+    def __init__(self, metric='token_set_ratio', workers=-1):
+        if rf_process is None:
+            raise ImportError("rapidfuzz is not installed")
+        self.metric = getattr(rf_fuzz, metric)
+        self.workers = workers
+
+    def prepare(self, names):
+        return [full_process(name) for name in names]
+
+    def scores(self, query, prepared):
+        query = full_process(query)
+        if not query or not prepared:
+            return [0] * len(prepared)
+        try:
+            row = rf_process.cdist([query], prepared, scorer=self.metric, workers=self.workers)[0].tolist()
+        except ImportError:  # cdist needs numpy
+            row = [self.metric(query, name) for name in prepared]
+        return [int(round(score)) for score in row]
+
+
+BACKENDS = {
+    FuzzywuzzyScorer.name: FuzzywuzzyScorer,
+    RapidfuzzScorer.name: RapidfuzzScorer,
+}
+
+
+def get_scorer(backend=None, metric='token_set_ratio'):
+    """Return a scorer for ``backend``, falling back to fuzzywuzzy when rapidfuzz is unavailable."""
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend == 'auto':
+        backend = RapidfuzzScorer.name if rf_process is not None else FuzzywuzzyScorer.name
+    if backend == RapidfuzzScorer.name and rf_process is None:
+        backend = FuzzywuzzyScorer.name
+    return BACKENDS.get(backend, FuzzywuzzyScorer)(metric)
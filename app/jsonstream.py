@@ -0,0 +1,84 @@
+"""Incremental parsing of large top-level JSON arrays.
+
+``iter_json_array`` yields the elements of a ``[...]`` document one at a time
+from an iterable of byte chunks (e.g. ``response.iter_content()``), using the
+standard library's ``JSONDecoder.raw_decode`` on a small rolling buffer. Only
+the element being decoded and the unread part of the current chunk are held in
+memory, never the whole document or the whole parsed list.
+"""
+import codecs
+import json
+
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+_COMPACT_THRESHOLD = 1024 * 1024
+
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """Yield each element of the JSON array streamed in ``chunks``.
+
+    Raises ``ValueError`` if the document is not a JSON array, is invalid or is
+    truncated.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if pos > _COMPACT_THRESHOLD or pos == len(buffer):
+                buffer, pos = buffer[pos:], 0
+            buffer += text_decoder.decode(chunk)
+            return True
+        buffer += text_decoder.decode(b'', final=True)
+        eof = True
+        return False
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON array")
+        if buffer[pos] == ']':
+            return
+        if started:
+            if buffer[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}")
+            pos += 1
+            skip_whitespace()
+        started = True
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise ValueError("Invalid or truncated JSON array")
+                continue
+            # A number cut at a chunk boundary ("12" of "12.5e3") may continue in the next chunk
+            if (not eof and isinstance(item, (int, float)) and not isinstance(item, bool)
+                    and (end == len(buffer) or buffer[end] in _NUMBER_CHARS) and fill()):
+                continue
+            break
+        pos = end
+        yield item
@@ -0,0 +1,201 @@
+"""Scanning of library directories and matching them against the provider catalogue.
+
+Only the top level of a library is scanned: every title is one directory
+directly below ``movies_dir`` or ``series_dir``, and the season folders and
+.strm files beneath them are never visited. The listing is cached per path
+and reused while the directory's mtime is unchanged (adding, removing or
+renaming an entry bumps it), so a quiet library costs one stat per run.
+
+``NameIndex`` hashes a catalogue list by exact name and by normalised name
+once, so matching every directory in a library is one dict lookup per
+directory instead of a scan over the whole catalogue.
+
+``TokenIndex`` maps every title word to the movies containing it, so a wanted
+title is narrowed to the few movies containing all of its words before any
+fuzzy scoring. It is built when the movies cache is saved and persisted next
+to it.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from .normalize import strip_year, tokenize
+
+
+_listing_cache = {}
+_listing_lock = threading.Lock()
+
+
+def list_library_dirs(library_path):
+    """Return the sorted names of the directories directly inside ``library_path``.
+
+    A missing library root is treated as empty.
+    """
+    try:
+        st = os.stat(library_path)
+    except FileNotFoundError:
+        return []
+    stamp = (st.st_mtime_ns, st.st_ino)
+    with _listing_lock:
+        cached = _listing_cache.get(library_path)
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
+
+    names = []
+    with os.scandir(library_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    names.append(entry.name)
+            except OSError:
+                continue
+    names.sort()
+
+    with _listing_lock:
+        _listing_cache[library_path] = (stamp, names)
+    return list(names)
+
+
+class NameIndex:
+    """Exact-name and normalised-name lookup over a list of catalogue records.
+
+    When several records share a name the first one wins, like the linear
+    ``next(...)`` scans this replaces. A ``normalized_name`` stored on the
+    record (computed when the VOD cache is saved) is used instead of calling
+    ``normalize`` again.
+    """
+
+    def __init__(self, items, normalize=None):
+        self.normalize = normalize
+        self.exact = {}
+        self.normalized = {}
+        for item in items:
+            name = item['name']
+            self.exact.setdefault(name, item)
+            if normalize is not None:
+                self.normalized.setdefault(item.get('normalized_name') or normalize(name), item)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def match(self, name):
+        """Return the record named ``name``, falling back to a normalised match, or None."""
+        item = self.exact.get(name)
+        if item is None and self.normalize is not None:
+            item = self.normalized.get(self.normalize(name))
+        return item
+
+
+class TokenIndex:
+    """Inverted index from title word to catalogue entries.
+
+    Each entry is ``(movie, stripped_name, year)`` with the year already split
+    off, so the fuzzy matcher neither re-normalises the catalogue nor scores
+    titles that cannot contain every word of the wanted title.
+    """
+
+    def __init__(self, entries, postings, fingerprint=None):
+        self.entries = entries
+        self.postings = postings
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, movies, fingerprint=None):
+        entries = []
+        postings = {}
+        for position, movie in enumerate(movies):
+            stripped, year = strip_year(movie['name'])
+            entries.append(({'name': movie['name'], 'stream_id': movie['stream_id']}, stripped, year))
+            for token in tokenize(stripped):
+                postings.setdefault(token, []).append(position)
+        return cls(entries, postings, fingerprint)
+
+    def candidates(self, title):
+        """Return the entries whose stripped name contains every word of ``title``, in catalogue order."""
+        tokens = tokenize(title)
+        if not tokens:
+            return list(self.entries)
+        lists = sorted((self.postings.get(token, ()) for token in tokens), key=len)
+        positions = set(lists[0])
+        for other in lists[1:]:
+            if not positions:
+                break
+            positions.intersection_update(other)
+        return [self.entries[position] for position in sorted(positions)]
+
+    def to_json(self):
+        return {'fingerprint': self.fingerprint,
+                'entries': [[movie, stripped, year] for movie, stripped, year in self.entries],
+                'postings': self.postings}
+
+    @classmethod
+    def from_json(cls, data):
+        entries = [(movie, stripped, year) for movie, stripped, year in data['entries']]
+        return cls(entries, data['postings'], data.get('fingerprint'))
+
+
+def movies_fingerprint(movies):
+    digest = hashlib.sha1()
+    for movie in movies:
+        digest.update(f"{movie['stream_id']}\t{movie['name']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PersistentTokenIndex:
+    """``TokenIndex`` over a movies catalogue, persisted next to the cache file.
+
+    ``rebuild()`` is called when the cache is saved. ``get()`` reuses the
+    in-memory index while the cache file is unchanged, then the index file if
+    the catalogue's ids and names still match its fingerprint, and only
+    rebuilds when they do not (e.g. the cache was replaced by hand).
+    """
+
+    def __init__(self, index_path, catalogue):
+        self.index_path = index_path
+        self.catalogue = catalogue
+        self._lock = threading.Lock()
+        self._index = None
+        self._stamp = None
+
+    def _cache_stamp(self):
+        self.catalogue.exists()  # imports a legacy JSON cache if needed
+        st = os.stat(self.catalogue.cache_path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        with self._lock:
+            stamp = self._cache_stamp()
+            if self._index is not None and stamp == self._stamp:
+                return self._index
+            movies = self.catalogue.listing
+            fingerprint = movies_fingerprint(movies)
+            if self._index is None or self._index.fingerprint != fingerprint:
+                self._index = self._load()
+            if self._index is None or self._index.fingerprint != fingerprint:
+                self._index = self._build_and_save(movies, fingerprint)
+            self._stamp = stamp
+            return self._index
+
+    def rebuild(self):
+        with self._lock:
+            stamp = self._cache_stamp()
+            movies = self.catalogue.listing
+            self._index = self._build_and_save(movies, movies_fingerprint(movies))
+            self._stamp = stamp
+            return self._index
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return TokenIndex.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _build_and_save(self, movies, fingerprint):
+        index = TokenIndex.build(movies, fingerprint)
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index.to_json(), f)
+        os.replace(tmp_path, self.index_path)
+        return index
@@ -0,0 +1,154 @@
+"""Paged, newest-first reading of the M3Usort log without loading the whole file.
+
+``iter_lines_reverse`` walks a file backwards from a byte offset in fixed-size
+blocks and yields its lines newest first, so the first log page costs one or
+two block reads however large the file is.
+
+``LogReader`` adds a small index over the lines that pass a filter: the total
+count and the byte offset of every ``checkpoint_every``-th one. It is built
+with a single forward scan the first time and then only extended with what
+was appended since, so the page count is always known, and a deep page is
+read by seeking to the nearest checkpoint instead of scanning from either
+end. A rotated or truncated file is detected by its inode and size and
+re-indexed.
+"""
+import os
+import threading
+
+
+BLOCK_SIZE = 64 * 1024
+CHECKPOINT_EVERY = 1000
+
+
+def is_webserver_line(line):
+    """True for the request lines logged by the web server (hidden by ``hide_webserver_logs``)."""
+    return 'GET /' in line or 'POST /' in line
+
+
+def _decode(raw):
+    return raw.decode('utf-8', errors='replace').strip()
+
+
+def iter_lines_reverse(f, end, block_size=BLOCK_SIZE):
+    """Yield the decoded lines of binary file ``f`` before byte offset ``end``, last line first.
+
+    Empty lines are yielded too; a newline right before ``end`` ends the last
+    line rather than starting an empty one.
+    """
+    if end <= 0:
+        return
+    position = end
+    tail = b''
+    last = True
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        block = f.read(read_size) + tail
+        lines = block.split(b'\n')
+        # The first piece may be the end of a line that starts in an earlier block
+        tail = lines.pop(0)
+        for raw in reversed(lines):
+            if last:
+                last = False
+                if not raw:
+                    continue
+            yield _decode(raw)
+    if not last or tail:
+        yield _decode(tail)
+
+
+class LogReader:
+    """Newest-first pages of the lines of ``path`` for which ``keep(line)`` is true.
+
+    Lines are stripped of surrounding whitespace; empty lines (e.g. inside a
+    logged traceback) are kept, as they take up a line on the page too. A last
+    line without its newline yet is still being written and is left for the
+    next call.
+    """
+
+    def __init__(self, path, keep=None, checkpoint_every=CHECKPOINT_EVERY, block_size=BLOCK_SIZE):
+        self.path = path
+        self.keep = keep or (lambda line: True)
+        self.checkpoint_every = checkpoint_every
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode):
+        self._inode = inode
+        self._scanned = 0
+        self._count = 0
+        self._checkpoints = []
+
+    def _refresh(self, f):
+        """Index the complete lines appended since the last call."""
+        st = os.fstat(f.fileno())
+        if st.st_ino != self._inode or st.st_size < self._scanned:
+            self._reset(st.st_ino)
+        f.seek(self._scanned)
+        offset = self._scanned
+        remaining = st.st_size - offset
+        pending = b''
+        while remaining > 0:
+            block = f.read(min(self.block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            lines = (pending + block).split(b'\n')
+            pending = lines.pop()
+            for raw in lines:
+                if self.keep(_decode(raw)):
+                    if self._count % self.checkpoint_every == 0:
+                        self._checkpoints.append(offset)
+                    self._count += 1
+                offset += len(raw) + 1
+        # A partly written last line is indexed on the next call, once it is complete
+        self._scanned = offset
+
+    def page(self, page, lines_per_page):
+        """Return ``(lines, total_pages)`` for 1-based ``page``, newest lines first."""
+        try:
+            with open(self.path, 'rb') as f, self._lock:
+                self._refresh(f)
+                total = self._count
+                total_pages = -(-total // lines_per_page)
+                skip = (page - 1) * lines_per_page
+                if page < 1 or skip >= total:
+                    return [], total_pages
+                if skip < self.checkpoint_every:
+                    return self._from_end(f, skip, lines_per_page), total_pages
+                first = max(total - skip - lines_per_page, 0)
+                return self._from_checkpoint(f, first, total - skip - first)[::-1], total_pages
+        except FileNotFoundError:
+            return [], 0
+
+    def _from_end(self, f, skip, count):
+        lines = []
+        for line in iter_lines_reverse(f, self._scanned, self.block_size):
+            if not self.keep(line):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            lines.append(line)
+            if len(lines) == count:
+                break
+        return lines
+
+    def _from_checkpoint(self, f, first, count):
+        """Read ``count`` kept lines in file order, starting with the ``first``-th kept line."""
+        checkpoint = first // self.checkpoint_every
+        index = checkpoint * self.checkpoint_every
+        f.seek(self._checkpoints[checkpoint])
+        lines = []
+        for raw in f:
+            line = _decode(raw)
+            if not self.keep(line):
+                continue
+            if index >= first:
+                lines.append(line)
+                if len(lines) == count:
+                    break
+            index += 1
+        return lines
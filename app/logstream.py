@@ -0,0 +1,93 @@
+"""Live broadcast of log records to any number of observers.
+
+``LogBroadcaster`` is a ``logging.Handler`` installed next to the log file
+handler, so everything written through ``PrintLog``/``logging`` (including the
+web server's request lines) also lands in a small in-memory ring buffer with
+a sequence number. Observers block on a condition until records newer than
+the last one they saw arrive and then take just those, so each observer costs
+O(new lines) per wake-up and never touches the log file.
+"""
+import logging
+import threading
+from collections import deque
+
+
+DEFAULT_CAPACITY = 1000
+LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
+
+
+class LogEntry:
+    __slots__ = ('seq', 'levelno', 'levelname', 'line')
+
+    def __init__(self, seq, levelno, levelname, line):
+        self.seq = seq
+        self.levelno = levelno
+        self.levelname = levelname
+        self.line = line
+
+
+class LogBroadcaster(logging.Handler):
+    """Keeps the last ``capacity`` formatted records and wakes waiting observers on each new one."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__()
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._entries = deque(maxlen=capacity)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def latest(self):
+        """Sequence number of the newest record; pass it to ``wait()`` to receive only what follows."""
+        return self._seq
+
+    def resume_after(self, last_event_id):
+        """Sequence number to resume after for a client's ``Last-Event-ID``.
+
+        Sequence numbers restart at 0 with the process, so an id that is
+        missing, negative or ahead of ``latest`` comes from an earlier run and
+        resumes from ``latest``.
+        """
+        latest = self._seq
+        if last_event_id is None or last_event_id < 0 or last_event_id > latest:
+            return latest
+        return last_event_id
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._condition:
+            self._seq += 1
+            self._entries.append(LogEntry(self._seq, record.levelno, record.levelname, line))
+            self._condition.notify_all()
+
+    def wait(self, after, timeout=None):
+        """Return the buffered entries newer than sequence number ``after``, oldest first.
+
+        Blocks up to ``timeout`` seconds for one to arrive; returns [] on timeout.
+        Entries that already dropped out of the ring buffer are skipped.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._seq > after, timeout):
+                return []
+            new = []
+            for entry in reversed(self._entries):
+                if entry.seq <= after:
+                    break
+                new.append(entry)
+        new.reverse()
+        return new
+
+
+def install(logger=None, capacity=DEFAULT_CAPACITY):
+    """Attach a LogBroadcaster to ``logger`` (the root logger by default), reusing one already attached."""
+    logger = logger or logging.getLogger()
+    for handler in logger.handlers:
+        if isinstance(handler, LogBroadcaster):
+            return handler
+    handler = LogBroadcaster(capacity)
+    logger.addHandler(handler)
+    return handler
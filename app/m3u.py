@@ -0,0 +1,289 @@
+"""Streaming M3U reader/writer and playlist rebuild engine.
+
+The provider playlist is read one ``#EXTINF``/URL pair at a time into
+lightweight ``M3UEntry`` records, so nothing ever holds the whole playlist
+in memory. The rebuild keeps only the entries it is going to write: pinned
+channels are indexed by name and whitelisted groups by group-title while the
+file streams past, and the curated playlist is then written in one go.
+
+Downloads are streamed the same way: the provider response goes to disk in
+chunks and is renamed over the previous playlist only once it is complete.
+Refreshes are conditional: the ETag, Last-Modified and SHA-256 of the last
+download are kept next to the playlist, so an unchanged upstream is detected
+either by a 304 or by an identical body hash and the old file is kept. The
+same metadata records which playlist hash and rebuild settings the curated
+playlist was last built from, so a rebuild is skipped only when neither
+changed.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import requests
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 120)  # (connect, read) seconds
+PROGRESS_INTERVAL = 10  # seconds between progress reports
+
+logger = logging.getLogger(__name__)
+
+_DURATION_RE = re.compile(r'#EXTINF:\s*(-?[\d.]+)')
+_ATTRIBUTE_RE = re.compile(r'\s*([\w-]+)="([^"]*)"')
+
+
+class M3UEntry:
+    """A single playlist entry: the parsed ``#EXTINF`` line, extra tag lines and the stream URL."""
+    __slots__ = ('name', 'duration', 'attributes', 'extras', 'url')
+
+    def __init__(self, name='', duration='-1', attributes=None, extras=None, url=''):
+        self.name = name
+        self.duration = duration
+        self.attributes = attributes if attributes is not None else {}
+        self.extras = extras if extras is not None else []
+        self.url = url
+
+    def to_m3u_plus(self):
+        attributes = ''.join(f' {key}="{value}"' for key, value in self.attributes.items())
+        extras = ''.join(f'{extra}\n' for extra in self.extras)
+        return f'#EXTINF:{self.duration}{attributes},{self.name}\n{extras}{self.url}\n'
+
+    def key(self):
+        """Hashable value of the entry; two entries with the same key are written identically."""
+        return (self.name, self.duration, tuple(sorted(self.attributes.items())), tuple(self.extras), self.url)
+
+
+def parse_extinf(line):
+    """Parse an ``#EXTINF`` line into (duration, attributes, name)."""
+    match = _DURATION_RE.match(line)
+    if match:
+        duration, pos = match.group(1), match.end()
+    else:
+        duration, pos = '-1', len('#EXTINF:')
+
+    attributes = {}
+    while True:
+        match = _ATTRIBUTE_RE.match(line, pos)
+        if not match:
+            break
+        attributes[match.group(1)] = match.group(2)
+        pos = match.end()
+
+    comma = line.find(',', pos)
+    name = line[comma + 1:].strip() if comma != -1 else ''
+    return duration, attributes, name
+
+
+def iter_m3u(m3u_path, groups=None, names=None):
+    """Yield ``M3UEntry`` records from an M3U file, one at a time.
+
+    When ``groups`` and/or ``names`` are given, only entries whose group-title
+    is in ``groups`` or whose name is in ``names`` are yielded.
+    """
+    filtered = groups is not None or names is not None
+    groups = groups or ()
+    names = names or ()
+    entry = None
+    with open(m3u_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#EXTINF'):
+                duration, attributes, name = parse_extinf(line)
+                entry = M3UEntry(name, duration, attributes)
+            elif line.startswith('#'):
+                if entry is not None and not line.startswith('#EXTM3U'):
+                    entry.extras.append(line)
+            elif entry is not None:
+                entry.url = line
+                if not filtered or entry.attributes.get('group-title') in groups or entry.name in names:
+                    yield entry
+                entry = None
+
+
+def write_m3u(output_path, entries):
+    """Write entries as an m3u_plus playlist, replacing ``output_path`` atomically."""
+    tmp_path = f'{output_path}.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write('#EXTM3U\n')
+        for entry in entries:
+            file.write(entry.to_m3u_plus())
+            count += 1
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def select_channels(channels, target_channel_names, desired_group_titles, new_group_title):
+    """Return (collected_channels, added_target_names) for the curated playlist.
+
+    Target channels come first, in the configured order, moved into
+    ``new_group_title``. Then every channel of each desired group follows, in
+    group order, skipping channels equal to one already collected (so an
+    exact-duplicate provider entry is written once). ``channels``
+    is consumed in a single pass and only matching channels are retained.
+    """
+    target_channel_names = target_channel_names or []
+    desired_group_titles = desired_group_titles or []
+    wanted_names = set(target_channel_names)
+    wanted_groups = set(desired_group_titles)
+
+    by_name = {}
+    by_group = {}
+    for channel in channels:
+        if channel.name in wanted_names and channel.name not in by_name:
+            by_name[channel.name] = channel
+        group_title = channel.attributes.get('group-title')
+        if group_title in wanted_groups:
+            by_group.setdefault(group_title, []).append(channel)
+
+    collected_channels = []
+    collected_keys = set()
+    added_targets = []
+
+    for name in target_channel_names:
+        channel = by_name.get(name)
+        if channel is None:
+            continue
+        channel.attributes['group-title'] = new_group_title
+        collected_channels.append(channel)
+        collected_keys.add(channel.key())
+        added_targets.append(name)
+
+    for group_title in desired_group_titles:
+        for channel in by_group.get(group_title, ()):
+            key = channel.key()
+            if key not in collected_keys:
+                collected_channels.append(channel)
+                collected_keys.add(key)
+
+    return collected_channels, added_targets
+
+
+def file_hash(filepath):
+    """Generate a hash for a file."""
+    hash_func = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            hash_func.update(chunk)
+    return hash_func.hexdigest()
+
+
+def load_download_meta(output_path):
+    """Return the validators stored for the last download of ``output_path``."""
+    try:
+        with open(f'{output_path}.meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_download_meta(output_path, meta):
+    meta_path = f'{output_path}.meta.json'
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(f'{meta_path}.tmp', meta_path)
+
+
+def rebuild_fingerprint(output_name, target_channel_names, desired_group_titles, new_group_title):
+    """Hash of the settings that shape the curated playlist."""
+    settings = [output_name, list(target_channel_names or []), list(desired_group_titles or []), new_group_title]
+    return hashlib.sha256(json.dumps(settings).encode('utf-8')).hexdigest()
+
+
+def is_rebuild_current(m3u_path, fingerprint):
+    """True if the last rebuild used the current ``m3u_path`` download and settings ``fingerprint``."""
+    meta = load_download_meta(m3u_path)
+    sha256 = meta.get('sha256')
+    return sha256 is not None and meta.get('rebuild') == {'sha256': sha256, 'settings': fingerprint}
+
+
+def record_rebuild(m3u_path, fingerprint):
+    """Remember that the curated playlist was rebuilt from the current ``m3u_path`` with ``fingerprint``."""
+    meta = load_download_meta(m3u_path)
+    meta['rebuild'] = {'sha256': meta.get('sha256'), 'settings': fingerprint}
+    _save_download_meta(m3u_path, meta)
+
+
+def download_m3u_file(url, output_path, log=logger.info, session=None):
+    """Refresh ``output_path`` from ``url``, returning True if the playlist changed.
+
+    The request carries If-None-Match/If-Modified-Since from the previous
+    download of the same URL; a 304 or a body with the same SHA-256 leaves the
+    existing file untouched (apart from its mtime, which records the check).
+    Otherwise the body is streamed in chunks to a temp file and atomically
+    replaces ``output_path``, so readers never see a partially written
+    playlist. Progress and throughput are reported through ``log``.
+    """
+    http = session or requests
+    tmp_path = f'{output_path}.part'
+    have_file = os.path.exists(output_path)
+    meta = load_download_meta(output_path) if have_file else {}
+    previous_sha256 = meta.get('sha256') or (file_hash(output_path) if have_file else None)
+
+    # Validators are only meaningful for the URL they were issued for
+    headers = {}
+    if have_file and meta.get('url') == url:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    start = last_report = time.monotonic()
+    written = 0
+    digest = hashlib.sha256()
+    try:
+        with http.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+            if response.status_code == 304:
+                os.utime(output_path)
+                log("M3U not modified upstream (HTTP 304), keeping existing file")
+                return False
+            response.raise_for_status()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            total = int(response.headers.get('Content-Length') or 0)
+            with open(tmp_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    file.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        log(f"Downloading M3U: {_format_progress(written, total, now - start)}")
+                file.flush()
+                os.fsync(file.fileno())
+
+        sha256 = digest.hexdigest()
+        new_meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'sha256': sha256}
+        if 'rebuild' in meta:
+            new_meta['rebuild'] = meta['rebuild']
+        if sha256 == previous_sha256:
+            os.remove(tmp_path)
+            os.utime(output_path)
+            _save_download_meta(output_path, new_meta)
+            log(f"M3U content unchanged upstream (sha256 {sha256[:12]}), keeping existing file")
+            return False
+
+        os.replace(tmp_path, output_path)
+        _save_download_meta(output_path, new_meta)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    log(f"Downloaded M3U: {_format_progress(written, written, time.monotonic() - start)}")
+    return True
+
+
+def _format_progress(written, total, elapsed):
+    mb = written / (1024 * 1024)
+    rate = mb / elapsed if elapsed > 0 else 0
+    if total:
+        return f"{mb:.1f} MB of {total / (1024 * 1024):.1f} MB ({min(written * 100 // total, 100)}%) at {rate:.1f} MB/s"
+    return f"{mb:.1f} MB at {rate:.1f} MB/s"
@@ -0,0 +1,49 @@
+"""Title normalisation shared by library matching, wanted-list search and TMDB lookups.
+
+All patterns are compiled once at import, and the per-title helpers are
+memoised with an LRU cache: the same catalogue names and library directories
+come back on every scheduled run, so repeat calls are a dict lookup.
+"""
+import re
+from functools import lru_cache
+
+
+CACHE_SIZE = 262144
+
+_QUALITY_SUFFIX_RE = re.compile(
+    r'\b(4K|HDR|SDR|UHD|BluRay|BDRip|BRRip|WEB-?DL|WEBRip|DVDRip|REMUX|HEVC|x264|x265|H\.?264|H\.?265|DTS|AAC|Atmos)\b.*$',
+    re.IGNORECASE)
+_TRAILING_PAREN_YEAR_RE = re.compile(r'\s*\(\d{4}\)\s*$')
+_YEAR_SUFFIX_RE = re.compile(r'\(\d{4}\)$')
+_SEARCH_YEAR_SUFFIX_RE = re.compile(r'\s*[\(\-]\s*\d{4}\s*[\)\-]?\s*$')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_movie_name(name):
+    """Strip year, quality tags, and normalize for matching."""
+    # Remove quality/format suffixes (4K, HDR, BluRay, etc.)
+    name = _QUALITY_SUFFIX_RE.sub('', name)
+    # Remove trailing year in parens
+    name = _TRAILING_PAREN_YEAR_RE.sub('', name)
+    # Normalize whitespace and case
+    return name.strip().lower()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strip_year(movie_name):
+    """Split a trailing ``(YYYY)`` off a title; returns (title, year or None)."""
+    match = _YEAR_SUFFIX_RE.search(movie_name)
+    if match:
+        return movie_name[:match.start()].strip(), int(match.group()[1:-1])
+    return movie_name, None
+
+
+def clean_search_title(name):
+    """Strip a trailing year, e.g. ``(2019)`` or ``- 2019``, for a TMDB search query."""
+    return _SEARCH_YEAR_SUFFIX_RE.sub('', name).strip()
+
+
+def tokenize(text):
+    """Lowercase ``text``, turn punctuation into spaces and return its set of words."""
+    return set(_PUNCTUATION_RE.sub(' ', text.lower()).split())
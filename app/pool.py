@@ -0,0 +1,28 @@
+"""Bounded fan-out over a thread pool.
+
+``imap_bounded`` keeps at most ``limit`` calls submitted to a pool at any
+time and hands each result back as soon as it completes, so a long list of
+provider requests never queues every item up front, and the caller can write
+or checkpoint results while the rest are still in flight.
+"""
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+def imap_bounded(pool, fn, items, limit):
+    """Yield ``fn(item)`` for every item, in completion order, with at most ``limit`` calls in flight.
+
+    An exception raised by ``fn`` is re-raised from the generator.
+    """
+    limit = max(1, int(limit))
+    queue = iter(items)
+    in_flight = set()
+    while True:
+        for item in queue:
+            in_flight.add(pool.submit(fn, item))
+            if len(in_flight) >= limit:
+                break
+        if not in_flight:
+            return
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
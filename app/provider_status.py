@@ -0,0 +1,95 @@
+"""Cached provider account status for the dashboard.
+
+The Xtream ``get_user_info`` probe can take seconds on a slow provider, so the
+dashboard never calls it inline. ``ProviderStatus`` keeps the last answer in
+memory and returns it immediately; once it is older than the TTL, the next
+read starts one background refresh and keeps serving the previous value
+until the new one arrives. Every open dashboard tab therefore shares one probe
+per TTL instead of sending one per page view.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+DEFAULT_TTL = 300
+RETRY_AFTER = 60
+
+
+def parse_user_info(user_info):
+    """Turn a ``get_user_info`` ``user_info`` record into the dashboard fields."""
+    expires = datetime.utcfromtimestamp(int(user_info['exp_date']))
+    return {
+        'status': user_info.get('status'),
+        'exp_date': expires.strftime('%Y-%m-%d'),
+        'exp_date_days_left': (expires.date() - datetime.utcnow().date()).days,
+        'is_trial': user_info.get('is_trial'),
+        'active_cons': user_info.get('active_cons'),
+        'max_connections': user_info.get('max_connections'),
+    }
+
+
+EMPTY_STATUS = {
+    'status': None,
+    'exp_date': None,
+    'exp_date_days_left': 9999,
+    'is_trial': None,
+    'active_cons': None,
+    'max_connections': None,
+}
+
+
+class ProviderStatus:
+    """TTL cache around ``fetch(url) -> user_info`` for the configured playlist URL.
+
+    ``log`` is the app's log function, called as ``log(message, level)``.
+
+    A failed refresh keeps the last good value and is retried after
+    ``RETRY_AFTER`` seconds rather than the full TTL. A change of URL drops the
+    cached value, since it belongs to another account.
+    """
+
+    def __init__(self, fetch, log, ttl=DEFAULT_TTL):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.log = log
+        self._lock = threading.Lock()
+        self._url = None
+        self._fields = dict(EMPTY_STATUS)
+        self._refreshed_at = None
+        self._expires = 0.0
+        self._refreshing = False
+
+    def get(self, url):
+        """Return the cached status for ``url`` plus ``refreshed_at``; starts a background refresh if stale."""
+        with self._lock:
+            if url != self._url:
+                self._url = url
+                self._fields = dict(EMPTY_STATUS)
+                self._refreshed_at = None
+                self._expires = 0.0
+            if url and not self._refreshing and time.monotonic() >= self._expires:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, args=(url,), daemon=True).start()
+            return self._payload()
+
+    def _refresh(self, url):
+        try:
+            fields = parse_user_info(self.fetch(url))
+        except Exception as e:
+            self.log(f"Provider status refresh failed: {e}", "WARNING")
+            with self._lock:
+                self._refreshing = False
+                self._expires = time.monotonic() + min(RETRY_AFTER, self.ttl)
+            return
+        with self._lock:
+            self._refreshing = False
+            if url == self._url:
+                self._fields = fields
+                self._refreshed_at = datetime.now()
+                self._expires = time.monotonic() + self.ttl
+
+    def _payload(self):
+        payload = dict(self._fields)
+        payload['refreshed_at'] = self._refreshed_at.strftime('%Y-%m-%d %H:%M:%S') if self._refreshed_at else None
+        return payload
@@ -10,12 +10,25 @@ from urllib.parse import urlparse
 from functools import wraps
 from flask import (
     Blueprint, render_template, request, redirect, url_for, 
-    flash, session, send_from_directory, jsonify, abort, current_app as app
+    flash, session, send_from_directory, jsonify, abort, stream_with_context, current_app as app
 )
 from werkzeug.security import generate_password_hash, check_password_hash
-from ipytv import playlist
-from ipytv.playlist import M3UPlaylist
+from .catalogue import SORTS as CATALOGUE_SORTS, MoviesCatalogue, SeriesCatalogue, catalogue_key
+from .config_store import ConfigStore
+from .dashboard import format_hhmm, ttl_cache
+from .enrichment import DEFAULT_CHECKPOINT, DEFAULT_RATE_LIMIT, DEFAULT_WORKERS, enrich_catalogue
 from .forms import ConfigForm
+from .fuzzy import get_scorer
+from .library import NameIndex, PersistentTokenIndex, TokenIndex, list_library_dirs
+from .logreader import LogReader, is_webserver_line
+from .logstream import install as install_log_broadcaster
+from .m3u import (download_m3u_file, is_rebuild_current, iter_m3u, rebuild_fingerprint, record_rebuild,
+                  select_channels, write_m3u)
+from .normalize import clean_search_title, normalize_movie_name, strip_year
+from .provider_status import DEFAULT_TTL as PROVIDER_STATUS_TTL, ProviderStatus
+from .series_sync import DEFAULT_WORKERS as SERIES_SYNC_WORKERS, SeriesSyncState, sync_series
+from .strm import WRITTEN, StrmManifest
+from .xtream import get_client
 from flask_apscheduler import APScheduler
 import secrets
 import socket
@@ -31,7 +44,6 @@ import base64
 from fuzzywuzzy import process, fuzz
 
 
-logging.getLogger('ipytv').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main_bp', __name__)
@@ -55,11 +67,31 @@ UPDATE_AVAILABLE = 0
 UPDATE_VERSION = ""
 GROUPS_CACHE = {'groups': [], 'last_updated': None}
 CACHE_DURATION = 3600  # Duration in seconds (e.g., 300 seconds = 5 minutes)
+M3U_REFRESH_STATUS = {'result': None, 'last_checked': None, 'last_changed': None}
+CATALOGUE_PAGE_SIZE = 120  # Titles per /api/movies or /api/series window
+CATALOGUE_MAX_PAGE_SIZE = 500
+DASHBOARD_FILE_TTL = 10  # Seconds the dashboard reuses file ages and catalogue counts
+DASHBOARD_IP_TTL = 300
 
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 CONFIG_PATH = os.path.join(CURRENT_DIR, '..', 'config.py')
 CONFIG_PATH = os.path.normpath(CONFIG_PATH)
 BASE_DIR = os.path.dirname(CONFIG_PATH)
+CONFIG = ConfigStore(CONFIG_PATH)
+MOVIES_CATALOGUE = MoviesCatalogue(os.path.join(BASE_DIR, 'files', 'movies_cache.sqlite'),
+                                   legacy_path=os.path.join(BASE_DIR, 'files', 'movies_cache.json'))
+SERIES_CATALOGUE = SeriesCatalogue(os.path.join(BASE_DIR, 'files', 'series_cache.sqlite'),
+                                   legacy_path=os.path.join(BASE_DIR, 'files', 'series_cache.json'))
+MOVIES_TOKEN_INDEX = PersistentTokenIndex(os.path.join(BASE_DIR, 'files', 'movies_token_index.json'), MOVIES_CATALOGUE)
+STRM_MANIFEST = StrmManifest(os.path.join(BASE_DIR, 'files', 'strm_manifest.json'))
+SERIES_SYNC_STATE = SeriesSyncState(os.path.join(BASE_DIR, 'files', 'series_sync_state.json'))
+LOG_FILE = os.path.join(BASE_DIR, 'logs', 'M3Usort.log')
+LOG_READERS = {}
+LOG_BROADCASTER = install_log_broadcaster()
+LOG_STREAM_KEEPALIVE = 15  # Seconds between SSE keep-alive comments on a quiet log
+PROVIDER_STATUS = ProviderStatus(lambda m3u_url: get_client(m3u_url).api('get_user_info', timeout=8).json()['user_info'],
+                                 log=lambda message, level: PrintLog(message, level),
+                                 ttl=int((os.path.exists(CONFIG_PATH) and CONFIG.get('provider_status_ttl')) or PROVIDER_STATUS_TTL))
 
 MUST_CHANGE_PW = 0
 LOCKOUT_TIMEFRAME = timedelta(minutes=30)
@@ -125,163 +157,131 @@ def scheduled_system_tasks():
 def enrich_vod_cache():
     """Background enrichment: fetch tmdb_id/plot for items missing them. Runs after fast cache build."""
     try:
-        m3u_url = get_credential('url')
-        if not m3u_url or '://' not in m3u_url or '/get.php' not in m3u_url:
-            return
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        base = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}"
+        client = get_xtream_client()
     except Exception as e:
         PrintLog(f"enrich_vod_cache: URL parse failed: {e}", "ERROR")
         return
 
-    # Enrich movies
-    try:
-        movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-        if os.path.exists(movies_cache_path):
-            movies_data = json.load(open(movies_cache_path, encoding='utf-8'))
-            enriched = 0
-            for movie in movies_data:
-                if not movie.get('tmdb_id') and not movie.get('plot'):
-                    try:
-                        r = requests.get(f"{base}&action=get_vod_info&vod_id={movie.get('stream_id')}", timeout=5)
-                        if r.status_code == 200:
-                            info = r.json().get('info', {})
-                            movie['tmdb_id'] = info.get('tmdb_id') or info.get('tmdb') or ''
-                            movie['imdb_id'] = info.get('imdb_id') or info.get('imdb') or ''
-                            movie['plot']    = info.get('plot') or info.get('description') or info.get('overview') or ''
-                            movie['rating']  = info.get('rating') or info.get('rating_5based') or ''
-                            enriched += 1
-                    except Exception:
-                        pass
-            if enriched:
-                with open(movies_cache_path, 'w', encoding='utf-8') as f:
-                    json.dump(movies_data, f)
-                PrintLog(f"Enriched {enriched} movies with TMDB data", "INFO")
-    except Exception as e:
-        PrintLog(f"enrich_vod_cache: movies failed: {e}", "ERROR")
+    options = dict(
+        workers=int(get_config_variable(CONFIG_PATH, 'enrich_workers') or DEFAULT_WORKERS),
+        rate_limit=float(get_config_variable(CONFIG_PATH, 'enrich_rate_limit') or DEFAULT_RATE_LIMIT),
+        checkpoint_every=int(get_config_variable(CONFIG_PATH, 'enrich_checkpoint') or DEFAULT_CHECKPOINT),
+        log=lambda message: PrintLog(message, "INFO"),
+    )
 
-    # Enrich series
-    try:
-        series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-        if os.path.exists(series_cache_path):
-            series_data = json.load(open(series_cache_path, encoding='utf-8'))
-            enriched = 0
-            for serie in series_data:
-                if not serie.get('tmdb_id') and not serie.get('plot'):
-                    try:
-                        r = requests.get(f"{base}&action=get_series_info&series_id={serie.get('series_id')}", timeout=5)
-                        if r.status_code == 200:
-                            info = r.json().get('info', {})
-                            serie['tmdb_id'] = info.get('tmdb_id') or info.get('tmdb') or ''
-                            serie['imdb_id'] = info.get('imdb_id') or info.get('imdb') or ''
-                            serie['plot']    = info.get('plot') or info.get('description') or info.get('overview') or ''
-                            serie['rating']  = info.get('rating') or info.get('rating_5based') or ''
-                            enriched += 1
-                    except Exception:
-                        pass
-            if enriched:
-                with open(series_cache_path, 'w', encoding='utf-8') as f:
-                    json.dump(series_data, f)
-                PrintLog(f"Enriched {enriched} series with TMDB data", "INFO")
-    except Exception as e:
-        PrintLog(f"enrich_vod_cache: series failed: {e}", "ERROR")
+    def fetch_info(action, id_param):
+        def fetch(item_id):
+            r = client.api(action, timeout=5, **{id_param: item_id})
+            if r.status_code != 200:
+                return None
+            return r.json().get('info', {})
+        return fetch
+
+    with client.lease():
+        # Enrich movies
+        try:
+            if MOVIES_CATALOGUE.exists():
+                enriched = enrich_catalogue(MOVIES_CATALOGUE, fetch_info('get_vod_info', 'vod_id'), label='movies', **options)
+                if enriched:
+                    PrintLog(f"Enriched {enriched} movies with TMDB data", "INFO")
+        except Exception as e:
+            PrintLog(f"enrich_vod_cache: movies failed: {e}", "ERROR")
+
+        # Enrich series
+        try:
+            if SERIES_CATALOGUE.exists():
+                enriched = enrich_catalogue(SERIES_CATALOGUE, fetch_info('get_series_info', 'series_id'), label='series', **options)
+                if enriched:
+                    PrintLog(f"Enriched {enriched} series with TMDB data", "INFO")
+        except Exception as e:
+            PrintLog(f"enrich_vod_cache: series failed: {e}", "ERROR")
 
 def save_vod_cache():
     """Fetch and save full movies and series data from provider to local JSON cache files."""
     try:
-        m3u_url = get_credential('url')
-        if not m3u_url or '://' not in m3u_url or '/get.php' not in m3u_url:
-            PrintLog("save_vod_cache: no valid M3U URL configured", "ERROR")
-            return
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        base = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}"
+        client = get_xtream_client()
     except Exception as e:
-        PrintLog(f"save_vod_cache: failed to parse URL: {e}", "ERROR")
+        PrintLog(f"save_vod_cache: {e}", "ERROR")
         return
 
     # ── Movies ───────────────────────────────────────────────────────────────
     try:
-        cat_resp = requests.get(f"{base}&action=get_vod_categories", timeout=30)
-        cat_resp.raise_for_status()
-        movie_cats = {str(c['category_id']): c['category_name'] for c in cat_resp.json()}
+        movie_cats = {str(c['category_id']): c['category_name'] for c in client.api_json('get_vod_categories')}
     except Exception as e:
         PrintLog(f"save_vod_cache: failed to fetch movie categories: {e}", "WARNING")
         movie_cats = {}
 
-    try:
-        resp = requests.get(f"{base}&action=get_vod_streams", timeout=60)
-        resp.raise_for_status()
-        movies_data = resp.json()
-        for movie in movies_data:
-            if not movie.get('category_name'):
-                movie['category_name'] = movie_cats.get(str(movie.get('category_id', '')), '')
-
-        movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
+    def movie_carry_over(prev):
         # Preserve existing enrichment data (tmdb_id, plot etc) from previous cache
-        existing_info = {}
-        if os.path.exists(movies_cache_path):
-            try:
-                existing = json.load(open(movies_cache_path, encoding='utf-8'))
-                existing_info = {m['stream_id']: m for m in existing if m.get('tmdb_id') or m.get('plot')}
-            except Exception:
-                pass
-        for movie in movies_data:
-            prev = existing_info.get(movie.get('stream_id'))
-            if prev:
-                for field in ('tmdb_id', 'imdb_id', 'plot', 'rating'):
-                    if prev.get(field):
-                        movie[field] = prev[field]
-        with open(movies_cache_path, 'w', encoding='utf-8') as f:
-            json.dump(movies_data, f)
-        PrintLog(f"Saved movies cache ({len(movies_data)} items)", "INFO")
+        if prev.get('tmdb_id') or prev.get('plot'):
+            return {field: prev[field] for field in ('tmdb_id', 'imdb_id', 'plot', 'rating') if prev.get(field)}
+
+    try:
+        count = stream_vod_cache(MOVIES_CATALOGUE, client.api_stream('get_vod_streams', timeout=(5, 120)), movie_cats,
+                                 movie_carry_over, ('tmdb_id', 'imdb_id', 'plot', 'rating'))
+        PrintLog(f"Saved movies cache ({count} items)", "INFO")
     except Exception as e:
         PrintLog(f"save_vod_cache: failed to save movies cache: {e}", "ERROR")
 
+    try:
+        MOVIES_TOKEN_INDEX.rebuild()
+    except Exception as e:
+        PrintLog(f"save_vod_cache: failed to build movies token index: {e}", "ERROR")
+
     # ── Series ───────────────────────────────────────────────────────────────
     try:
-        cat_resp = requests.get(f"{base}&action=get_series_categories", timeout=30)
-        cat_resp.raise_for_status()
-        series_cats = {str(c['category_id']): c['category_name'] for c in cat_resp.json()}
+        series_cats = {str(c['category_id']): c['category_name'] for c in client.api_json('get_series_categories')}
     except Exception as e:
         PrintLog(f"save_vod_cache: failed to fetch series categories: {e}", "WARNING")
         series_cats = {}
 
+    def serie_carry_over(prev):
+        # Preserve existing enrichment data and a fixed TMDB cover from previous cache
+        tmdb_cover = (prev.get('cover') or '').startswith('https://image.tmdb')
+        if prev.get('tmdb_id') or prev.get('plot') or tmdb_cover:
+            fields = {field: prev[field] for field in ('tmdb_id', 'imdb_id', 'plot', 'rating') if prev.get(field)}
+            if tmdb_cover:
+                fields['cover'] = prev['cover']
+            return fields
+
     try:
-        resp = requests.get(f"{base}&action=get_series", timeout=60)
-        resp.raise_for_status()
-        series_data = resp.json()
-        for serie in series_data:
-            if not serie.get('category_name'):
-                serie['category_name'] = series_cats.get(str(serie.get('category_id', '')), '')
-
-        series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-        # Preserve existing enrichment data from previous cache
-        existing_info = {}
-        if os.path.exists(series_cache_path):
-            try:
-                existing = json.load(open(series_cache_path, encoding='utf-8'))
-                existing_info = {s['series_id']: s for s in existing if s.get('tmdb_id') or s.get('plot') or s.get('cover','').startswith('https://image.tmdb')}
-            except Exception:
-                pass
-        for serie in series_data:
-            prev = existing_info.get(serie.get('series_id'))
-            if prev:
-                for field in ('tmdb_id', 'imdb_id', 'plot', 'rating'):
-                    if prev.get(field):
-                        serie[field] = prev[field]
-                # Preserve fixed TMDB cover
-                if prev.get('cover', '').startswith('https://image.tmdb'):
-                    serie['cover'] = prev['cover']
-        with open(series_cache_path, 'w', encoding='utf-8') as f:
-            json.dump(series_data, f)
-        PrintLog(f"Saved series cache ({len(series_data)} items)", "INFO")
+        count = stream_vod_cache(SERIES_CATALOGUE, client.api_stream('get_series', timeout=(5, 120)), series_cats,
+                                 serie_carry_over, ('tmdb_id', 'imdb_id', 'plot', 'rating', 'cover'))
+        PrintLog(f"Saved series cache ({count} items)", "INFO")
     except Exception as e:
         PrintLog(f"save_vod_cache: failed to save series cache: {e}", "ERROR")
 
+def stream_vod_cache(catalogue, items, categories, carry_over, carry_fields):
+    """Stream provider records into ``catalogue``'s cache file, one record in memory at a time.
+
+    Each record gets its category name and normalized name filled in and the
+    fields ``carry_over(previous_record)`` returns merged from the previous
+    cache, which is read for ``carry_fields`` only. Only that carried-over
+    data is kept while the new list streams in.
+    """
+    preserved = {}
+    if catalogue.exists():
+        try:
+            for prev in catalogue.columns(catalogue.id_field, *carry_fields):
+                fields = carry_over(prev)
+                if fields:
+                    preserved[catalogue_key(prev.get(catalogue.id_field))] = fields
+        except Exception as e:
+            PrintLog(f"save_vod_cache: could not read previous {os.path.basename(catalogue.cache_path)}: {e}", "WARNING")
+    catalogue.invalidate()  # release the previous records before the new list streams in
+
+    def prepared():
+        for item in items:
+            if not item.get('category_name'):
+                item['category_name'] = categories.get(str(item.get('category_id', '')), '')
+            item['normalized_name'] = normalize_movie_name(item.get('name') or '')
+            fields = preserved.get(catalogue_key(item.get(catalogue.id_field)))
+            if fields:
+                item.update(fields)
+            yield item
+
+    return catalogue.write_stream(prepared())
+
 def refresh_jellyfin():
     if get_config_variable(CONFIG_PATH, 'jellyfin_enabled') != "1":
         return
@@ -295,45 +295,64 @@ def refresh_jellyfin():
         except Exception as e:
             PrintLog(f"Error refreshing Jellyfin: {e}", "ERROR")
 
-def scheduled_vod_download():
+def scheduled_vod_download(force_full=False):
+    # Refresh the catalogue first, so the library sync sees this run's
+    # listing (and each series' current last_modified), not the previous one
+    save_vod_cache()
+
     series_dir = get_config_variable(CONFIG_PATH, 'series_dir')
-    update_series_directory(series_dir)
+    update_series_directory(series_dir, force_full=force_full)
     find_wanted_series(series_dir)
 
     movies_dir = get_config_variable(CONFIG_PATH, 'movies_dir')
     update_movies_directory(movies_dir)
     find_wanted_movies(movies_dir)
 
-    save_vod_cache()
     Thread(target=enrich_vod_cache, daemon=True).start()
     refresh_jellyfin()
 
 def scheduled_renew_m3u():
     m3u_url = get_credential('url')
     original_m3u_path = f'{BASE_DIR}/files/original.m3u'
-    download_m3u(m3u_url, original_m3u_path)
+    changed = download_m3u(m3u_url, original_m3u_path)
+    output_name, target_channel_names, desired_group_titles, new_group_title = get_rebuild_settings()
+    fingerprint = rebuild_fingerprint(output_name, target_channel_names, desired_group_titles, new_group_title)
+    if (changed is False and os.path.exists(os.path.join(BASE_DIR, 'files', output_name))
+            and is_rebuild_current(original_m3u_path, fingerprint)):
+        PrintLog("M3U and rebuild settings unchanged, skipping rebuild", "INFO")
+        return
     PrintLog(f"Downloaded the M3U file to: {original_m3u_path}", "INFO")
     rebuild()
 
-def file_hash(filepath):
-    """Generate a hash for a file."""
-    hash_func = hashlib.sha256()
-    with open(filepath, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_func.update(chunk)
-    return hash_func.hexdigest()
-
-
 def download_m3u(url, output_path):
+    """Refresh the provider playlist. Returns True if it changed, False if unchanged, None on error."""
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        with open(output_path, 'w', encoding='utf-8') as file:
-            file.write(response.text)
-        sleep(1)
-        update_groups_cache()
+        # Reuse the pooled session for the saved URL only; a URL typed into the
+        # settings form but not saved yet must not replace the shared client
+        client = None
+        if url == get_credential('url'):
+            try:
+                client = get_client(url)
+            except ValueError:
+                pass
+        if client is None:
+            changed = download_m3u_file(url, output_path, log=lambda message: PrintLog(message, "INFO"))
+        else:
+            with client.lease():
+                changed = download_m3u_file(url, output_path, log=lambda message: PrintLog(message, "INFO"), session=client.session)
     except Exception as e:
         PrintLog(f"Error downloading M3U: {e}", "ERROR")
+        M3U_REFRESH_STATUS['result'] = 'error'
+        return None
+
+    now = datetime.now()
+    M3U_REFRESH_STATUS['last_checked'] = now
+    M3U_REFRESH_STATUS['result'] = 'changed' if changed else 'unchanged'
+    if changed:
+        M3U_REFRESH_STATUS['last_changed'] = now
+    if changed or not is_cache_valid():
+        update_groups_cache()
+    return changed
 
 def is_download_needed(file_path, max_age_hours):
     if not os.path.exists(file_path):
@@ -351,30 +370,44 @@ def is_download_needed(file_path, max_age_hours):
             return True
         return False
 
-def update_series_directory(series_dir):
-    series_list = GetSeriesList()
-    overwrite_series = int(get_config_variable(CONFIG_PATH, 'overwrite_series') or 0)
-
-    for root, dirs, files in os.walk(series_dir):
-        for dir_name in dirs:
-            matching_series = next((s for s in series_list if s['name'] == dir_name), None)
-            if matching_series:
-                DownloadSeries(matching_series['series_id'])
-            else:
-                PrintLog(f"No matching series found for directory: {dir_name}", "WARNING")
+def update_series_directory(series_dir, force_full=False):
+    series_index = NameIndex(GetSeriesList(), normalize_movie_name)
+    followed = []
 
-def normalize_movie_name(name):
-    """Strip year, quality tags, and normalize for matching."""
-    # Remove quality/format suffixes (4K, HDR, BluRay, etc.)
-    name = re.sub(r'\b(4K|HDR|SDR|UHD|BluRay|BDRip|BRRip|WEB-?DL|WEBRip|DVDRip|REMUX|HEVC|x264|x265|H\.?264|H\.?265|DTS|AAC|Atmos)\b.*$', '', name, flags=re.IGNORECASE)
-    # Remove trailing year in parens
-    name = re.sub(r'\s*\(\d{4}\)\s*$', '', name)
-    # Normalize whitespace and case
-    return name.strip().lower()
+    for dir_name in list_library_dirs(series_dir):
+        matching_series = series_index.match(dir_name)
+        if matching_series:
+            followed.append(matching_series)
+        else:
+            PrintLog(f"No matching series found for directory: {dir_name}", "WARNING")
+
+    client, series_dir, overwrite_series = get_series_settings()
+    # Files written with another overwrite setting are stale for this one, so a change resyncs everything
+    sync_settings = {'overwrite_series': overwrite_series}
+    if force_full:
+        PrintLog(f"Full series resync requested: fetching all {len(followed)} followed series", "INFO")
+        to_sync = followed
+    else:
+        to_sync = SERIES_SYNC_STATE.changed(followed, sync_settings)
+        PrintLog(f"{len(to_sync)} of {len(followed)} followed series changed since the last sync", "INFO")
+    by_id = {s['series_id']: s for s in to_sync}
 
+    writer = STRM_MANIFEST.writer(log=PrintLog)
+    try:
+        with client.lease():
+            timings = sync_series(
+                list(by_id),
+                lambda series_id: client.api_json('get_series_info', series_id=series_id),
+                lambda series_id, series_info: write_series_episodes(series_info, series_id, client, series_dir, overwrite_series, writer),
+                workers=int(get_config_variable(CONFIG_PATH, 'series_sync_workers') or SERIES_SYNC_WORKERS),
+                log=PrintLog,
+            )
+    finally:
+        writer.close('Series .strm files')
+    SERIES_SYNC_STATE.mark_synced((by_id[t.series_id] for t in timings if t.ok), sync_settings)
 
 def update_movies_directory(movies_dir):
-    movies_list = GetMoviesList()
+    movies_index = NameIndex(GetMoviesList(), normalize_movie_name)
     overwrite_movies = int(get_config_variable(CONFIG_PATH, 'overwrite_movies'))
 
     m3u_url = get_credential('url')
@@ -382,42 +415,25 @@ def update_movies_directory(movies_dir):
     parsed_url = urlparse(m3u_url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
-    # Build normalized lookup: normalized_name -> movie object
-    normalized_cache = {}
-    for movie in movies_list:
-        key = normalize_movie_name(movie['name'])
-        if key not in normalized_cache:
-            normalized_cache[key] = movie
-
-    for root, dirs, files in os.walk(movies_dir):
-        for dir_name in dirs:
-            # Try exact match first
-            matching_movie = next((m for m in movies_list if m['name'] == dir_name), None)
-
-            # Fall back to normalized match
-            if not matching_movie:
-                norm_dir = normalize_movie_name(dir_name)
-                matching_movie = normalized_cache.get(norm_dir)
-
-            if matching_movie:
-                strm_file_path = os.path.join(movies_dir, dir_name, f"{dir_name}.strm")
-                if not os.path.exists(strm_file_path) or overwrite_movies == 1:
-                    PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
-                    strm_content = f"{base_url}/movie/{username}/{password}/{matching_movie['stream_id']}.mkv"
-                    with open(strm_file_path, 'w') as strm_file:
-                        strm_file.write(strm_content)
-            else:
-                PrintLog(f"No matching movie found for directory: '{dir_name}'", "WARNING")
+    writer = STRM_MANIFEST.writer(log=PrintLog)
+    for dir_name in list_library_dirs(movies_dir):
+        # Exact match first, then normalized match
+        matching_movie = movies_index.match(dir_name)
+
+        if matching_movie:
+            strm_file_path = os.path.join(movies_dir, dir_name, f"{dir_name}.strm")
+            strm_content = f"{base_url}/movie/{username}/{password}/{matching_movie['stream_id']}.mkv"
+            if writer.write(strm_file_path, strm_content, overwrite=overwrite_movies == 1) == WRITTEN:
+                PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
+        else:
+            PrintLog(f"No matching movie found for directory: '{dir_name}'", "WARNING")
+    writer.close('Movie .strm files')
 
 
 def get_config_variable(config_path, variable_name):
     config_variable = None
     try:
-        with open(CONFIG_PATH, 'r') as file:
-            config_content = file.read()
-        config_namespace = {}
-        exec(config_content, {}, config_namespace)
-        config_variable = config_namespace.get(variable_name)
+        config_variable = CONFIG.get(variable_name)
     except Exception as e:
         logging.error(f"Error reading config variable '{variable_name}': {e}")
     return config_variable
@@ -425,52 +441,16 @@ def get_config_variable(config_path, variable_name):
 def get_config_array(config_path, array_name):
     config_variable = None
     try:
-        with open(CONFIG_PATH, 'r') as file:
-            config_content = file.read()
-        config_namespace = {}
-        exec(config_content, {}, config_namespace)
-        config_variable = config_namespace.get(array_name)
+        config_variable = CONFIG.get(array_name)
     except Exception as e:
         logging.error(f"Error reading config array '{array_name}': {e}")
     return config_variable
 
 def update_config_variable(config_path, variable_name, new_value):
-    variable_found = False
-    with open(config_path, 'r') as file:
-        lines = file.readlines()
-
-    with open(config_path, 'w') as file:
-        for line in lines:
-            if line.strip().startswith(f'{variable_name} ='):
-                file.write(f'{variable_name} = "{new_value}"\n')
-                variable_found = True
-            else:
-                file.write(line)
-
-        if not variable_found:
-            file.write(f'{variable_name} = "{new_value}"\n')
+    CONFIG.update(variables={variable_name: new_value})
 
 def update_config_array(config_path, array_name, new_value):
-    with open(CONFIG_PATH, 'r') as file:
-        lines = file.readlines()
-
-    with open(CONFIG_PATH, 'w') as file:
-        array_found = False
-        array_found2 = False
-        for line in lines:
-            if line.strip().startswith(f'{array_name} = ['):
-                file.write(f'{array_name} = [\n')
-                for value in new_value:
-                    file.write(f'    "{value}",\n')
-                file.write(']\n')
-                array_found = True
-                array_found2 = True
-            elif array_found and line.strip() == ']':
-                array_found = False
-            elif not array_found:
-                file.write(line)
-        if array_found2 == False:
-            file.write(f'{array_name} = {new_value}\n')
+    CONFIG.update(arrays={array_name: new_value})
 
 def extract_credentials_from_url(m3u_url):
     match = re.search(r'username=([^&]+)&password=([^&]+)', m3u_url)
@@ -478,6 +458,10 @@ def extract_credentials_from_url(m3u_url):
         return match.groups()
     return None, None
 
+def get_xtream_client():
+    """Return the shared provider API client for the configured M3U URL (raises ValueError if unset)."""
+    return get_client(get_credential('url'))
+
 
 # ─── Credential encryption ───────────────────────────────────────────────────
 
@@ -514,8 +498,7 @@ def get_credential(key):
     return decrypt_credential(value)
 
 def set_credential(key, value):
-    encrypted = encrypt_credential(value)
-    update_config_variable(CONFIG_PATH, key, encrypted)
+    CONFIG.update(variables={key: encrypt_credential(value)})
 
 def migrate_credentials():
     """One-time migration: encrypt any plaintext credential fields."""
@@ -596,209 +579,106 @@ from flask import jsonify, render_template
 import requests
 import os
 
-def get_time_diff(file_path):
-    current_time = datetime.now()
+def format_time_diff(file_mod_time):
+    time_difference = datetime.now() - datetime.fromtimestamp(file_mod_time)
+    return format_hhmm(time_difference.seconds)
 
+def get_time_diff(file_path):
     if os.path.exists(file_path):
-        file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-        time_difference = current_time - file_mod_time
-        hours, remainder = divmod(time_difference.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        formatted_difference = f"{hours:02d}:{minutes:02d}"
-
-        return formatted_difference
+        return format_time_diff(os.path.getmtime(file_path))
     else:
         return "not found"
 
-@main_bp.route('/update_home_data')
-def update_home_data():
-    current_time = datetime.now()
+def get_m3u_refresh_summary():
+    """Describe the last conditional M3U refresh for the dashboard."""
+    result = M3U_REFRESH_STATUS['result']
+    if result == 'error':
+        return "download failed"
+    if not M3U_REFRESH_STATUS['last_checked']:
+        return "-"
+    summary = f"{result} (checked {M3U_REFRESH_STATUS['last_checked'].strftime('%H:%M')})"
+    if result == 'unchanged' and M3U_REFRESH_STATUS['last_changed']:
+        summary += f", last changed {M3U_REFRESH_STATUS['last_changed'].strftime('%Y-%m-%d %H:%M')}"
+    return summary
+
+def get_provider_status():
+    """Account status for the dashboard, served from PROVIDER_STATUS and refreshed in the background."""
+    m3u_url = get_credential('url')
+    if not (m3u_url and '://' in m3u_url and '/get.php' in m3u_url):
+        m3u_url = None
+    return PROVIDER_STATUS.get(m3u_url)
 
-    original_m3u_path = f'{BASE_DIR}/files/original.m3u'
-    original_m3u_age = get_time_diff(original_m3u_path)
+@ttl_cache(DASHBOARD_FILE_TTL)
+def dashboard_file_mtime(file_path):
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return None
 
-    output = get_config_variable(CONFIG_PATH, 'output') or 'sorted.m3u'
-    sorted_m3u_path = f'{BASE_DIR}/files/{output}'
-    sorted_m3u_age = get_time_diff(sorted_m3u_path)
+@ttl_cache(DASHBOARD_FILE_TTL)
+def dashboard_catalogue_counts():
+    return MOVIES_CATALOGUE.count, SERIES_CATALOGUE.count
 
-    next_m3u = "-"
-    try:
-        job = scheduler.get_job('M3U Download scheduler')
-        if job:
-            now = datetime.now(timezone.utc)
-            remaining_time = job.next_run_time - now
-            total_seconds = int(remaining_time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            next_m3u = f"{hours:02d}:{minutes:02d}"
-    except Exception:
-        pass
+@ttl_cache(DASHBOARD_IP_TTL)
+def dashboard_internal_ip():
+    return get_internal_ip()
 
-    next_vod = "-"
+def time_until_job(job_id):
+    """Time until the next run of a scheduler job as HH:MM, or "-"."""
     try:
-        job = scheduler.get_job('VOD scheduler')
+        job = scheduler.get_job(job_id)
         if job:
-            now = datetime.now(timezone.utc)
-            remaining_time = job.next_run_time - now
-            total_seconds = int(remaining_time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            next_vod = f"{hours:02d}:{minutes:02d}"
+            return format_hhmm((job.next_run_time - datetime.now(timezone.utc)).total_seconds())
     except Exception:
         pass
+    return "-"
 
-    # Provider info — optional
-    status = exp_date_readable = is_trial = active_cons = max_connections = None
-    exp_date_days_left = 9999
-    try:
-        m3u_url = get_credential('url')
-        if m3u_url and '://' in m3u_url and '/get.php' in m3u_url:
-            scheme, rest = m3u_url.split('://', 1)
-            domain_with_port, _ = rest.split('/get.php', 1)
-            username, password = extract_credentials_from_url(m3u_url)
-            api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_user_info"
-            response = requests.get(api_url, timeout=8)
-            user_info = response.json()['user_info']
-            exp_date_readable = datetime.utcfromtimestamp(int(user_info['exp_date'])).strftime('%Y-%m-%d')
-            exp_date_days_left = (datetime.utcfromtimestamp(int(user_info['exp_date'])).date() - datetime.utcnow().date()).days
-            status = user_info.get('status')
-            is_trial = user_info.get('is_trial')
-            active_cons = user_info.get('active_cons')
-            max_connections = user_info.get('max_connections')
-    except Exception as e:
-        logging.warning(f"update_home_data: provider API failed: {e}")
+def dashboard_snapshot():
+    """Everything the dashboard shows; rendered by home() and returned as JSON by update_home_data()."""
+    output = get_config_variable(CONFIG_PATH, 'output') or 'sorted.m3u'
+    file_ages = {}
+    for key, file_name in (('original_m3u_age', 'original.m3u'), ('sorted_m3u_age', output)):
+        file_mod_time = dashboard_file_mtime(f'{BASE_DIR}/files/{file_name}')
+        file_ages[key] = format_time_diff(file_mod_time) if file_mod_time is not None else "not found"
 
-    movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-    series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-    total_movies = len(json.load(open(movies_cache_path, encoding='utf-8'))) if os.path.exists(movies_cache_path) else 0
-    total_series = len(json.load(open(series_cache_path, encoding='utf-8'))) if os.path.exists(series_cache_path) else 0
+    # Provider info — cached, refreshed in the background
+    provider = get_provider_status()
+    total_movies, total_series = dashboard_catalogue_counts()
 
-    uptime_duration = current_time - app.app_start_time
-    total_seconds = int(uptime_duration.total_seconds())
-    hours, remainder = divmod(total_seconds, 3600)
+    uptime_seconds = int((datetime.now() - app.app_start_time).total_seconds())
+    hours, remainder = divmod(uptime_seconds, 3600)
     minutes, seconds = divmod(remainder, 60)
-    uptime_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
-    internal_ip = get_internal_ip()
-    port_number = get_config_variable(CONFIG_PATH, 'port_number')
-
-    version = f"{VERSION} - Please update to {UPDATE_VERSION}" if UPDATE_AVAILABLE == 1 else VERSION
-
-    return jsonify(
+    return dict(
+        version=f"{VERSION} - Please update to {UPDATE_VERSION}" if UPDATE_AVAILABLE == 1 else VERSION,
         update_available=UPDATE_AVAILABLE,
-        next_m3u=next_m3u,
-        version=version,
-        next_vod=next_vod,
-        original_m3u_age=original_m3u_age,
-        sorted_m3u_age=sorted_m3u_age,
-        uptime=uptime_str,
+        next_m3u=time_until_job('M3U Download scheduler'),
+        next_vod=time_until_job('VOD scheduler'),
+        m3u_refresh=get_m3u_refresh_summary(),
+        uptime=f"{hours:02d}:{minutes:02d}:{seconds:02d}",
+        internal_ip=dashboard_internal_ip(),
+        port_number=get_config_variable(CONFIG_PATH, 'port_number'),
         output=output,
-        internal_ip=internal_ip,
-        port_number=port_number,
-        status=status,
-        exp_date=exp_date_readable,
-        exp_date_days_left=exp_date_days_left,
-        active_cons=active_cons,
-        is_trial=is_trial,
-        max_connections=max_connections,
+        status=provider['status'],
+        exp_date=provider['exp_date'],
+        exp_date_days_left=provider['exp_date_days_left'],
+        is_trial=provider['is_trial'],
+        active_cons=provider['active_cons'],
+        max_connections=provider['max_connections'],
+        status_refreshed_at=provider['refreshed_at'],
         total_movies=total_movies,
         total_series=total_series,
+        **file_ages,
     )
 
+@main_bp.route('/update_home_data')
+def update_home_data():
+    return jsonify(dashboard_snapshot())
+
 
 @main_bp.route('/home')
 def home():
-    current_time = datetime.now()
-
-    original_m3u_path = f'{BASE_DIR}/files/original.m3u'
-    original_m3u_age = get_time_diff(original_m3u_path)
-
-    output = get_config_variable(CONFIG_PATH, 'output') or 'sorted.m3u'
-    sorted_m3u_path = f'{BASE_DIR}/files/{output}'
-    sorted_m3u_age = get_time_diff(sorted_m3u_path)
-
-    next_m3u = "-"
-    try:
-        job = scheduler.get_job('M3U Download scheduler')
-        if job:
-            now = datetime.now(timezone.utc)
-            remaining_time = job.next_run_time - now
-            total_seconds = int(remaining_time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            next_m3u = f"{hours:02d}:{minutes:02d}"
-    except Exception:
-        pass
-
-    next_vod = "-"
-    try:
-        job = scheduler.get_job('VOD scheduler')
-        if job:
-            now = datetime.now(timezone.utc)
-            remaining_time = job.next_run_time - now
-            total_seconds = int(remaining_time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            next_vod = f"{hours:02d}:{minutes:02d}"
-    except Exception:
-        pass
-
-    # Provider info — optional, fails gracefully
-    status = exp_date_readable = is_trial = active_cons = max_connections = None
-    exp_date_days_left = 9999
-    try:
-        m3u_url = get_credential('url')
-        if m3u_url and '://' in m3u_url and '/get.php' in m3u_url:
-            scheme, rest = m3u_url.split('://', 1)
-            domain_with_port, _ = rest.split('/get.php', 1)
-            username, password = extract_credentials_from_url(m3u_url)
-            api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_user_info"
-            response = requests.get(api_url, timeout=8)
-            user_info = response.json()['user_info']
-            exp_date_readable = datetime.utcfromtimestamp(int(user_info['exp_date'])).strftime('%Y-%m-%d')
-            exp_date_days_left = (datetime.utcfromtimestamp(int(user_info['exp_date'])).date() - datetime.utcnow().date()).days
-            status = user_info.get('status')
-            is_trial = user_info.get('is_trial')
-            active_cons = user_info.get('active_cons')
-            max_connections = user_info.get('max_connections')
-    except Exception as e:
-        logging.warning(f"Home: provider API failed: {e}")
-
-    movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-    series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-    total_movies = len(json.load(open(movies_cache_path, encoding='utf-8'))) if os.path.exists(movies_cache_path) else 0
-    total_series = len(json.load(open(series_cache_path, encoding='utf-8'))) if os.path.exists(series_cache_path) else 0
-
-    uptime_duration = current_time - app.app_start_time
-    total_seconds = int(uptime_duration.total_seconds())
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    uptime_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-    internal_ip = get_internal_ip()
-    port_number = get_config_variable(CONFIG_PATH, 'port_number')
-
-    version = f"{VERSION} - Please update to {UPDATE_VERSION}" if UPDATE_AVAILABLE == 1 else VERSION
-
-    return render_template('home.html',
-                           version=version,
-                           update_available=UPDATE_AVAILABLE,
-                           next_m3u=next_m3u,
-                           next_vod=next_vod,
-                           original_m3u_age=original_m3u_age,
-                           sorted_m3u_age=sorted_m3u_age,
-                           uptime=uptime_str,
-                           internal_ip=internal_ip,
-                           port_number=port_number,
-                           output=output,
-                           status=status,
-                           exp_date=exp_date_readable,
-                           exp_date_days_left=exp_date_days_left,
-                           is_trial=is_trial,
-                           active_cons=active_cons,
-                           max_connections=max_connections,
-                           total_movies=total_movies,
-                           total_series=total_series)
+    return render_template('home.html', **dashboard_snapshot())
 
 
 @app.route('/logout')
@@ -810,12 +690,9 @@ def logout():
 @app.route('/GetMoviesList')
 def GetMoviesList():
     """Return movies list — reads from local cache, falls back to live API if cache missing."""
-    movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-    if os.path.exists(movies_cache_path):
+    if MOVIES_CATALOGUE.exists():
         try:
-            with open(movies_cache_path, 'r', encoding='utf-8') as f:
-                movies_data = json.load(f)
-            return [{'name': m['name'], 'stream_id': m['stream_id']} for m in movies_data]
+            return MOVIES_CATALOGUE.listing
         except Exception as e:
             PrintLog(f"GetMoviesList: failed to read cache: {e}", "ERROR")
 
@@ -825,13 +702,7 @@ def GetMoviesList():
         m3u_url = get_credential('url')
         if not m3u_url or '://' not in m3u_url or '/get.php' not in m3u_url:
             return movies
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_vod_streams&category_id=ALL"
-        response = requests.get(api_url, timeout=30)
-        response.raise_for_status()
-        movies_data = response.json()
+        movies_data = get_xtream_client().api_json('get_vod_streams', category_id='ALL')
         movies = [{'name': m['name'], 'stream_id': m['stream_id']} for m in movies_data]
     except Exception as e:
         PrintLog(f"Error fetching movies list: {e}", "ERROR")
@@ -840,12 +711,9 @@ def GetMoviesList():
 @app.route('/GetSeriesList')
 def GetSeriesList():
     """Return series list from local cache, fall back to live API if cache missing."""
-    series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-    if os.path.exists(series_cache_path):
+    if SERIES_CATALOGUE.exists():
         try:
-            with open(series_cache_path, 'r', encoding='utf-8') as f:
-                series_data = json.load(f)
-            return [{'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover', '')} for s in series_data]
+            return SERIES_CATALOGUE.listing
         except Exception as e:
             PrintLog(f"GetSeriesList: failed to read cache: {e}", "ERROR")
 
@@ -855,69 +723,76 @@ def GetSeriesList():
         m3u_url = get_credential('url')
         if not m3u_url or '://' not in m3u_url or '/get.php' not in m3u_url:
             return series
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_series&category_id=ALL"
-        response = requests.get(api_url, timeout=30)
-        response.raise_for_status()
-        series_data = response.json()
-        series = [{'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover', '')} for s in series_data]
+        series_data = get_xtream_client().api_json('get_series', category_id='ALL')
+        series = [{'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover', ''), 'last_modified': s.get('last_modified')} for s in series_data]
     except Exception as e:
         PrintLog(f"Error fetching series list: {e}", "ERROR")
     return series
 
-def DownloadSeries(series_id):
+def get_series_settings():
     series_dir = get_config_variable(CONFIG_PATH, 'series_dir')
-    m3u_url = get_credential('url')
-    username, password = extract_credentials_from_url(m3u_url)
+    client = get_xtream_client()
     overwrite_series = int(get_config_variable(CONFIG_PATH, 'overwrite_series'))
 
-    if not all([series_dir, m3u_url, username, password, isinstance(overwrite_series, int)]):
+    if not all([series_dir, client.username, client.password, isinstance(overwrite_series, int)]):
         raise ValueError("Configuration error. Ensure series_dir, m3u_url, username, password, and overwrite_series are set.")
+    return client, series_dir, overwrite_series
 
-    parsed_url = urlparse(m3u_url)
-    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-    series_info_url = f"{base_url}/player_api.php?username={username}&password={password}&action=get_series_info&series_id={series_id}"
+def DownloadSeries(series_id):
+    client, series_dir, overwrite_series = get_series_settings()
     try:
-        response = requests.get(series_info_url)
-        response.raise_for_status()
-        series_info = response.json()
+        series_info = client.api_json('get_series_info', series_id=series_id)
     except Exception as e:
         PrintLog(f"Error fetching series info for ID {series_id}: {e}", "ERROR")
         return
+    writer = STRM_MANIFEST.writer(log=PrintLog)
+    try:
+        write_series_episodes(series_info, series_id, client, series_dir, overwrite_series, writer)
+    finally:
+        writer.close('Series .strm files')
+
+def write_series_episodes(series_info, series_id, client, series_dir, overwrite_series, writer):
+    """Write the .strm files for one series' info payload. Returns (series_name, files_written, files_failed)."""
     series_name = series_info['info']['name']
+    base_url, username, password = client.stream_base_url, client.username, client.password
+    written = failed = 0
+
+    def write(episode):
+        nonlocal written, failed
+        try:
+            written += process_episode(episode, series_name, base_url, username, password, series_dir, overwrite_series, writer)
+        except Exception as episode_error:
+            failed += 1
+            PrintLog(f"Error processing episode '{episode.get('title')}' for series '{series_name}': {episode_error}", "ERROR")
 
     try:
         for season in series_info['episodes']:
             for episode in series_info['episodes'][season]:
-                process_episode(episode, series_name, base_url, username, password, series_dir, overwrite_series)
+                write(episode)
     except TypeError:
         try:
             for season_episodes in series_info['episodes']:
                 for episode in season_episodes:
-                    process_episode(episode, series_name, base_url, username, password, series_dir, overwrite_series)
+                    write(episode)
         except Exception as alternate_format_error:
+            failed += 1
             PrintLog(f"Error processing alternate episodes format for series '{series_name}' with ID {series_id}: {alternate_format_error}", "WARNING")
+    return series_name, written, failed
 
-def process_episode(episode, series_name, base_url, username, password, series_dir, overwrite_series):
-    try:
-        episode_id = episode['id']
-        episode_num = str(int(float(episode['episode_num']))).zfill(2)
-        season_num = str(int(float(episode.get('season', 1)))).zfill(2)
-        strm_file_name = f"{series_name} S{season_num}E{episode_num}.strm"
-        strm_content = f"{base_url}/series/{username}/{password}/{episode_id}.mkv"
-
-        series_dir_path = os.path.join(series_dir, series_name)
-        os.makedirs(series_dir_path, exist_ok=True)
-        strm_file_path = os.path.join(series_dir_path, strm_file_name)
-
-        if not os.path.exists(strm_file_path) or overwrite_series == 1:
-            PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
-            with open(strm_file_path, 'w') as strm_file:
-                strm_file.write(strm_content)
-    except Exception as episode_error:
-        PrintLog(f"Error processing episode '{episode['title']}' for series '{series_name}': {episode_error}", "ERROR")
+def process_episode(episode, series_name, base_url, username, password, series_dir, overwrite_series, writer):
+    """Write one episode's .strm file. Returns 1 if it was written, 0 if it was already up to date."""
+    episode_id = episode['id']
+    episode_num = str(int(float(episode['episode_num']))).zfill(2)
+    season_num = str(int(float(episode.get('season', 1)))).zfill(2)
+    strm_file_name = f"{series_name} S{season_num}E{episode_num}.strm"
+    strm_content = f"{base_url}/series/{username}/{password}/{episode_id}.mkv"
+
+    strm_file_path = os.path.join(series_dir, series_name, strm_file_name)
+
+    if writer.write(strm_file_path, strm_content, overwrite=overwrite_series == 1) == WRITTEN:
+        PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
+        return 1
+    return 0
 
 @main_bp.route('/add_series_to_server', methods=['POST'])
 def add_series_to_server():
@@ -933,47 +808,41 @@ def rebuildWeb():
     json = json_flash("Rebuild finished", "success")
     return json
 
+def get_rebuild_settings():
+    """Return (output_name, target_channel_names, desired_group_titles, new_group_title)."""
+    output_name = get_config_variable(CONFIG_PATH, 'output') or 'sorted.m3u'
+    target_channel_names = get_config_variable(CONFIG_PATH, 'target_channel_names') or []
+    desired_group_titles = get_config_variable(CONFIG_PATH, 'desired_group_titles') or []
+    new_group_title = get_config_variable(CONFIG_PATH, 'new_group_title')
+    return output_name, target_channel_names, desired_group_titles, new_group_title
+
 def rebuild():
     original_m3u_path = f'{BASE_DIR}/files/original.m3u'
-    output = get_config_variable(CONFIG_PATH, 'output')
-
-    output_name = get_config_variable(CONFIG_PATH, 'output')
+    output_name, target_channel_names, desired_group_titles, new_group_title = get_rebuild_settings()
     output_path = os.path.join(BASE_DIR, 'files', output_name)
-    original_playlist = playlist.loadf(original_m3u_path)
-    target_channel_names = get_config_variable(CONFIG_PATH, 'target_channel_names')
-    desired_group_titles = get_config_variable(CONFIG_PATH, 'desired_group_titles')
-    new_group_title = get_config_variable(CONFIG_PATH, 'new_group_title')
-    collected_channels = []
 
     PrintLog("Processing specific target channels...", "INFO")
-    for name in target_channel_names:
-        if any(channel.name == name for channel in original_playlist):
-            channel = next((channel for channel in original_playlist if channel.name == name), None)
-            channel.attributes['group-title'] = new_group_title
-            collected_channels.append(channel)
-            PrintLog(f'Added "{name}" to new group "{new_group_title}".', "INFO")
+    entries = iter_m3u(original_m3u_path, groups=set(desired_group_titles), names=set(target_channel_names))
+    collected_channels, added_targets = select_channels(entries, target_channel_names, desired_group_titles, new_group_title)
+    for name in added_targets:
+        PrintLog(f'Added "{name}" to new group "{new_group_title}".', "INFO")
 
     PrintLog("Filtering channels by desired group titles...", "INFO")
     for group_title in desired_group_titles:
         PrintLog(f"Adding group {group_title}", "INFO")
-        for channel in original_playlist:
-            if channel.attributes.get('group-title') == group_title and channel not in collected_channels:
-                collected_channels.append(channel)
 
     PrintLog(f"Total channels to be included in the new playlist: {len(collected_channels)}", "INFO")
 
-    new_playlist = M3UPlaylist()
-    new_playlist.append_channels(collected_channels)
-
-    with open(output_path, 'w', encoding='utf-8') as file:
-        content = new_playlist.to_m3u_plus_playlist()
-        file.write(content)
+    write_m3u(output_path, collected_channels)
+    record_rebuild(original_m3u_path, rebuild_fingerprint(output_name, target_channel_names, desired_group_titles, new_group_title))
     PrintLog(f'Exported the filtered and curated playlist to {output_path}', "INFO")
 
 @main_bp.route('/download')
 def download():
-    Thread(target=scheduled_vod_download, daemon=True).start()
-    json = json_flash("Download started in the background.", "success")
+    force_full = request.args.get('full') == '1'
+    Thread(target=scheduled_vod_download, kwargs={'force_full': force_full}, daemon=True).start()
+    message = "Full resync started in the background." if force_full else "Download started in the background."
+    json = json_flash(message, "success")
     return json
 
 
@@ -1046,49 +915,89 @@ def change_playlist_credentials():
 @main_bp.route('/series')
 def series():
     wanted_series = get_config_array(CONFIG_PATH, "wanted_series") or []
-    series = []
+    total = 0
     categories = []
     cache_age = None
 
-    series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-    if os.path.exists(series_cache_path):
-        cache_age = get_time_diff(series_cache_path)
+    if SERIES_CATALOGUE.exists():
+        cache_age = get_time_diff(SERIES_CATALOGUE.cache_path)
         try:
-            with open(series_cache_path, 'r', encoding='utf-8') as f:
-                series_data = json.load(f)
-            series = [{'name': s['name'], 'series_id': s['series_id'], 'series_cover': s.get('cover', ''), 'category': s.get('category_name', ''), 'tmdb_id': s.get('tmdb_id') or s.get('tmdb') or '', 'imdb_id': s.get('imdb_id') or s.get('imdb') or '', 'plot': s.get('plot') or s.get('description') or s.get('overview') or '', 'rating': s.get('rating') or s.get('rating_5based') or ''} for s in series_data]
-            categories = sorted(set(s['category'] for s in series if s['category']))
+            total = SERIES_CATALOGUE.count
+            categories = SERIES_CATALOGUE.categories
         except Exception as e:
             PrintLog(f"Error reading series cache: {e}", "ERROR")
             flash("Series cache could not be read. Please trigger a VOD download first.", "warning")
     else:
         flash("No series cache found. Please trigger a VOD download first.", "warning")
 
-    return render_template('series.html', series=series, wanted_series=wanted_series, categories=categories, cache_age=cache_age)
+    return render_template('series.html', total=total, wanted_series=wanted_series, categories=categories, cache_age=cache_age,
+                           page_size=CATALOGUE_PAGE_SIZE)
 
 
 @main_bp.route('/movies')
 def movies():
     wanted_movies = get_config_array(CONFIG_PATH, "wanted_movies") or []
-    movies = []
+    total = 0
     categories = []
     cache_age = None
 
-    movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-    if os.path.exists(movies_cache_path):
-        cache_age = get_time_diff(movies_cache_path)
+    if MOVIES_CATALOGUE.exists():
+        cache_age = get_time_diff(MOVIES_CATALOGUE.cache_path)
         try:
-            with open(movies_cache_path, 'r', encoding='utf-8') as f:
-                movies_data = json.load(f)
-            movies = [{'name': m['name'], 'stream_id': m['stream_id'], 'stream_icon': m.get('stream_icon', ''), 'category': m.get('category_name', ''), 'tmdb_id': m.get('tmdb_id') or m.get('tmdb') or '', 'imdb_id': m.get('imdb_id') or m.get('imdb') or '', 'plot': m.get('plot') or m.get('description') or m.get('overview') or '', 'rating': m.get('rating') or m.get('rating_5based') or ''} for m in movies_data]
-            categories = sorted(set(m['category'] for m in movies if m['category']))
+            total = MOVIES_CATALOGUE.count
+            categories = MOVIES_CATALOGUE.categories
         except Exception as e:
             PrintLog(f"Error reading movies cache: {e}", "ERROR")
             flash("Movies cache could not be read. Please trigger a VOD download first.", "warning")
     else:
         flash("No movies cache found. Please trigger a VOD download first.", "warning")
 
-    return render_template('movies.html', movies=movies, wanted_movies=wanted_movies, categories=categories, cache_age=cache_age)
+    return render_template('movies.html', total=total, wanted_movies=wanted_movies, categories=categories, cache_age=cache_age,
+                           page_size=CATALOGUE_PAGE_SIZE)
+
+
+def catalogue_page_response(catalogue, kind):
+    """Serve one window of a catalogue as JSON, with an ETag so an unchanged window is a 304.
+
+    Query parameters: offset, limit, category, q (every word must appear in
+    the name) and sort (one of ``CATALOGUE_SORTS``).
+    """
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', CATALOGUE_PAGE_SIZE)), 1), CATALOGUE_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    category = request.args.get('category', '')
+    search = request.args.get('q', '')
+    sort = request.args.get('sort', '')
+    if sort not in CATALOGUE_SORTS:
+        return jsonify({'error': f'sort must be one of: {", ".join(s for s in CATALOGUE_SORTS if s)}'}), 400
+
+    if not catalogue.exists():
+        return jsonify({'total': 0, 'items': []})
+    try:
+        etag = hashlib.sha1(json.dumps(
+            [catalogue.version, offset, limit, category, search.lower().split(), sort]).encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = jsonify(catalogue.page(offset, limit, category, search, sort))
+    except Exception as e:
+        PrintLog(f"Error reading {kind} cache: {e}", "ERROR")
+        return jsonify({'error': f'{kind.capitalize()} cache could not be read'}), 500
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@main_bp.route('/api/movies')
+def api_movies():
+    return catalogue_page_response(MOVIES_CATALOGUE, 'movies')
+
+
+@main_bp.route('/api/series')
+def api_series():
+    return catalogue_page_response(SERIES_CATALOGUE, 'series')
 
 
 @main_bp.route('/new')
@@ -1097,31 +1006,12 @@ def new_today():
     week_start = today - timedelta(days=6)
     week_str = f"{week_start.strftime('%B %d')} – {today.strftime('%B %d, %Y')}"
 
-    movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-    series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-
-    # Check if cache files exist
     cache_age = None
-    if os.path.exists(movies_cache_path):
-        cache_mod_time = datetime.fromtimestamp(os.path.getmtime(movies_cache_path))
-        cache_age = get_time_diff(movies_cache_path)
-
     new_movies = []
-    if os.path.exists(movies_cache_path):
+    if MOVIES_CATALOGUE.exists():
+        cache_age = get_time_diff(MOVIES_CATALOGUE.cache_path)
         try:
-            with open(movies_cache_path, 'r', encoding='utf-8') as f:
-                movies_data = json.load(f)
-            for movie in movies_data:
-                added = movie.get('added')
-                if added:
-                    added_date = datetime.fromtimestamp(int(added)).date()
-                    if added_date >= week_start:
-                        new_movies.append({
-                            'name': movie['name'],
-                            'stream_id': movie['stream_id'],
-                            'stream_icon': movie.get('stream_icon', ''),
-                            'added': int(added)
-                        })
+            new_movies = MOVIES_CATALOGUE.recent(week_start)
         except Exception as e:
             PrintLog(f"Error reading movies cache: {e}", "ERROR")
             flash("Movies cache could not be read. Please trigger a VOD download first.", "warning")
@@ -1129,30 +1019,15 @@ def new_today():
         flash("No movies cache found. Please trigger a VOD download first.", "warning")
 
     new_series = []
-    if os.path.exists(series_cache_path):
+    if SERIES_CATALOGUE.exists():
         try:
-            with open(series_cache_path, 'r', encoding='utf-8') as f:
-                series_data = json.load(f)
-            for serie in series_data:
-                added = serie.get('last_modified') or serie.get('added')
-                if added:
-                    added_date = datetime.fromtimestamp(int(added)).date()
-                    if added_date >= week_start:
-                        new_series.append({
-                            'name': serie['name'],
-                            'series_id': serie['series_id'],
-                            'series_cover': serie.get('cover', ''),
-                            'added': int(added)
-                        })
+            new_series = SERIES_CATALOGUE.recent(week_start)
         except Exception as e:
             PrintLog(f"Error reading series cache: {e}", "ERROR")
             flash("Series cache could not be read. Please trigger a VOD download first.", "warning")
     else:
         flash("No series cache found. Please trigger a VOD download first.", "warning")
 
-    new_movies.sort(key=lambda x: x['added'], reverse=True)
-    new_series.sort(key=lambda x: x['added'], reverse=True)
-
     return render_template('new.html', new_movies=new_movies, new_series=new_series, today=week_str, cache_age=cache_age)
 
 
@@ -1163,6 +1038,16 @@ def refresh_vod_cache():
     return redirect(url_for('main_bp.new_today'))
 
 
+@main_bp.route('/export/<kind>_cache.json')
+@admin_required
+def export_vod_cache(kind):
+    catalogue = {'movies': MOVIES_CATALOGUE, 'series': SERIES_CATALOGUE}.get(kind)
+    if catalogue is None or not catalogue.exists():
+        abort(404)
+    return app.response_class(stream_with_context(catalogue.iter_json()), mimetype='application/json',
+                              headers={'Content-Disposition': f'attachment; filename={kind}_cache.json'})
+
+
 @main_bp.route('/add_wanted_serie', methods=['POST'])
 def add_wanted_serie():
     wanted_serie = request.form.get('wanted_serie')
@@ -1213,12 +1098,6 @@ def remove_wanted_serie():
     return '{ "result": "OK"} '
 
 
-def strip_year(movie_name):
-    match = re.search(r'\(\d{4}\)$', movie_name)
-    if match:
-        return movie_name[:match.start()].strip(), int(match.group()[1:-1])
-    return movie_name, None
-
 def find_wanted_movies(movies_dir):
     match_type = get_config_variable(CONFIG_PATH, 'match_type')
     if match_type == "1" or match_type == None:
@@ -1249,17 +1128,18 @@ def find_wanted_series_fuzzy(series_dir):
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
     series_list = GetSeriesList()
+    stripped = [strip_year(serie['name']) for serie in series_list]
+    scorer = get_scorer(get_config_variable(CONFIG_PATH, 'fuzzy_backend'))
+    prepared_names = scorer.prepare(name for name, _ in stripped)
 
     for wanted in wanted_series.copy():
-        PrintLog(f"Searching for wanted serie '{wanted}' (method: fuzzywuzzy)", "INFO")
+        PrintLog(f"Searching for wanted serie '{wanted}' (method: {scorer.name})", "INFO")
         best_match = None
         highest_similarity = 0
         most_recent_year = 0
 
-        for serie in series_list:
-            serie_name_stripped, year = strip_year(serie['name'])
-            similarity = fuzz.token_set_ratio(wanted, serie_name_stripped)
-
+        scores = scorer.scores(wanted, prepared_names)
+        for serie, (serie_name_stripped, year), similarity in zip(series_list, stripped, scores):
             if similarity >= similarity_threshold:
                 is_new_best = (similarity > highest_similarity or
                                (similarity == highest_similarity and year and year > most_recent_year))
@@ -1314,27 +1194,21 @@ def find_wanted_movies_fuzzy(movies_dir):
     parsed_url = urlparse(m3u_url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
     
-    movies_list = GetMoviesList()
+    try:
+        movies_index = MOVIES_TOKEN_INDEX.get() if MOVIES_CATALOGUE.exists() else TokenIndex.build(GetMoviesList())
+    except Exception as e:
+        PrintLog(f"Movies token index unavailable, building it in memory: {e}", "WARNING")
+        movies_index = TokenIndex.build(GetMoviesList())
 
+    writer = STRM_MANIFEST.writer(log=PrintLog)
     for wanted in wanted_movies.copy():
         PrintLog(f"Searching for wanted movie '{wanted}' (method: fuzzywuzzy)", "INFO")
         best_match = None
         highest_similarity = 0
         most_recent_year = 0
 
-        # Normalize: lowercase, strip punctuation for word matching
-        wanted_clean = re.sub(r'[^\w\s]', ' ', wanted.lower())
-        wanted_words = set(wanted_clean.split())
-
-        for movie in movies_list:
-            movie_name_stripped, year = strip_year(movie['name'])
-            movie_clean = re.sub(r'[^\w\s]', ' ', movie_name_stripped.lower())
-            movie_words = set(movie_clean.split())
-
-            # All words in the search must appear in the movie name
-            if not wanted_words.issubset(movie_words):
-                continue
-
+        # Only movies whose name contains every word of the search are candidates
+        for movie, movie_name_stripped, year in movies_index.candidates(wanted):
             # Use ratio (not token_set) to avoid over-matching substrings
             similarity = fuzz.token_sort_ratio(wanted, movie_name_stripped)
 
@@ -1350,19 +1224,18 @@ def find_wanted_movies_fuzzy(movies_dir):
         if best_match:
             movie_dir_path = os.path.join(movies_dir, best_match['name'])
             if not os.path.exists(movie_dir_path) or overwrite_movies == 1:
-                os.makedirs(movie_dir_path, exist_ok=True)
                 strm_file_path = os.path.join(movie_dir_path, f"{best_match['name']}.strm")
                 strm_content = f"{base_url}/movie/{username}/{password}/{best_match['stream_id']}.mkv"
-                
-                with open(strm_file_path, 'w') as strm_file:
-                    strm_file.write(strm_content)
-                PrintLog(f"Created .strm file for {best_match['name']}", "NOTICE")
+
+                if writer.write(strm_file_path, strm_content, overwrite=True) == WRITTEN:
+                    PrintLog(f"Created .strm file for {best_match['name']}", "NOTICE")
                 wanted_movies.remove(wanted)
             else:
                 PrintLog(f"No match found for '{wanted}'", "WARNING")
         else:
             PrintLog(f"No match found for '{wanted}'", "WARNING")
 
+    writer.close('Wanted movie .strm files')
     update_config_array(CONFIG_PATH, 'wanted_movies', wanted_movies)
 
 def find_wanted_movies_string(movies_dir):
@@ -1379,6 +1252,7 @@ def find_wanted_movies_string(movies_dir):
     
     movies_list = GetMoviesList()
 
+    writer = STRM_MANIFEST.writer(log=PrintLog)
     for wanted in wanted_movies.copy():
         PrintLog(f"Searching for wanted movie '{wanted}' (method: string)", "NOTICE")
         matches = [movie for movie in movies_list if wanted.lower() in movie['name'].lower()]
@@ -1389,13 +1263,11 @@ def find_wanted_movies_string(movies_dir):
                 PrintLog(f"Skipping '{movie['name']}' as it already exists and overwrite is not allowed", "WARNING")
                 continue
 
-            os.makedirs(movie_dir_path, exist_ok=True)
             strm_file_path = os.path.join(movie_dir_path, f"{movie['name']}.strm")
             strm_content = f"{base_url}/movie/{username}/{password}/{movie['stream_id']}.mkv"
 
-            with open(strm_file_path, 'w') as strm_file:
-                strm_file.write(strm_content)
-            PrintLog(f"Created .strm file for {movie['name']}", "NOTICE")
+            if writer.write(strm_file_path, strm_content, overwrite=True) == WRITTEN:
+                PrintLog(f"Created .strm file for {movie['name']}", "NOTICE")
             found_match = True
 
         if found_match:
@@ -1403,6 +1275,7 @@ def find_wanted_movies_string(movies_dir):
         else:
             PrintLog(f"No match found for '{wanted}'", "NOTICE")
 
+    writer.close('Wanted movie .strm files')
     update_config_array(CONFIG_PATH, 'wanted_movies', wanted_movies)
 
 
@@ -1413,7 +1286,7 @@ def _tmdb_lookup(name, media_type, api_key):
         return None, None
     try:
         # Strip year from name for better matching
-        clean = re.sub(r'\s*[\(\-]\s*\d{4}\s*[\)\-]?\s*$', '', name).strip()
+        clean = clean_search_title(name)
         r = requests.get(
             f'https://api.themoviedb.org/3/search/{media_type}',
             params={'api_key': api_key, 'query': clean, 'language': 'en-US'},
@@ -1435,10 +1308,8 @@ def get_vod_info(stream_id):
     # Check movies cache first
     tmdb_id = imdb_id = rating = plot = name = ''
     try:
-        movies_cache_path = os.path.join(BASE_DIR, 'files', 'movies_cache.json')
-        if os.path.exists(movies_cache_path):
-            movies_data = json.load(open(movies_cache_path, encoding='utf-8'))
-            movie = next((m for m in movies_data if m.get('stream_id') == stream_id), None)
+        if MOVIES_CATALOGUE.exists():
+            movie = MOVIES_CATALOGUE.get(stream_id)
             if movie:
                 name = movie.get('name', '')
                 tmdb_id = movie.get('tmdb_id') or ''
@@ -1452,14 +1323,7 @@ def get_vod_info(stream_id):
 
     # Fall back to live provider API
     try:
-        m3u_url = get_credential('url')
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_vod_info&vod_id={stream_id}"
-        response = requests.get(api_url, timeout=5)
-        response.raise_for_status()
-        info = response.json().get('info', {})
+        info = get_xtream_client().api_json('get_vod_info', timeout=5, vod_id=stream_id).get('info', {})
         tmdb_id = info.get('tmdb_id') or info.get('tmdb') or tmdb_id
         imdb_id = info.get('imdb_id') or info.get('imdb') or imdb_id
         rating  = info.get('rating') or info.get('rating_5based') or rating
@@ -1484,10 +1348,8 @@ def get_series_info_meta(series_id):
 
     # Check series cache first
     try:
-        series_cache_path = os.path.join(BASE_DIR, 'files', 'series_cache.json')
-        if os.path.exists(series_cache_path):
-            series_data = json.load(open(series_cache_path, encoding='utf-8'))
-            serie = next((s for s in series_data if s.get('series_id') == series_id), None)
+        if SERIES_CATALOGUE.exists():
+            serie = SERIES_CATALOGUE.get(series_id)
             if serie:
                 name    = serie.get('name', '')
                 tmdb_id = serie.get('tmdb_id') or ''
@@ -1501,14 +1363,7 @@ def get_series_info_meta(series_id):
 
     # Fall back to live provider API
     try:
-        m3u_url = get_credential('url')
-        scheme, rest = m3u_url.split('://', 1)
-        domain_with_port, _ = rest.split('/get.php', 1)
-        username, password = extract_credentials_from_url(m3u_url)
-        api_url = f"{scheme}://{domain_with_port}/player_api.php?username={username}&password={password}&action=get_series_info&series_id={series_id}"
-        response = requests.get(api_url, timeout=5)
-        response.raise_for_status()
-        info = response.json().get('info', {})
+        info = get_xtream_client().api_json('get_series_info', timeout=5, series_id=series_id).get('info', {})
         tmdb_id = info.get('tmdb_id') or info.get('tmdb') or tmdb_id
         imdb_id = info.get('imdb_id') or info.get('imdb') or imdb_id
         rating  = info.get('rating') or info.get('rating_5based') or rating
@@ -1558,15 +1413,13 @@ def add_movie_to_server():
     parsed_url = urlparse(m3u_url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
-    movie_dir_path = os.path.join(movies_dir, movie_name)
-    os.makedirs(movie_dir_path, exist_ok=True)
-    strm_file_path = os.path.join(movie_dir_path, f"{movie_name}.strm")
+    strm_file_path = os.path.join(movies_dir, movie_name, f"{movie_name}.strm")
     strm_content = f"{base_url}/movie/{username}/{password}/{movie_id}.mkv"
-    
-    with open(strm_file_path, 'w') as strm_file:
-        strm_file.write(strm_content)
 
-    PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
+    writer = STRM_MANIFEST.writer()
+    if writer.write(strm_file_path, strm_content, overwrite=True) == WRITTEN:
+        PrintLog(f"Adding new file: {strm_file_path}", "NOTICE")
+    writer.close()
     return jsonify(message="Movie added successfully"), 200
 
 @main_bp.route('/')
@@ -1608,10 +1461,8 @@ def get_channels_for_selected_groups(selected_groups):
     if not os.path.exists(m3u_path):
         raise FileNotFoundError(f"The original M3U file at '{m3u_path}' was not found.")
     
-    m3u_playlist = playlist.loadf(m3u_path)
-    for channel in m3u_playlist:
-        if channel.attributes.get('group-title') in selected_groups:
-            all_channels.append(channel.name)
+    for channel in iter_m3u(m3u_path, groups=set(selected_groups)):
+        all_channels.append(channel.name)
     
     PrintLog(f"Channels to be added: {all_channels}", "INFO")
     return all_channels
@@ -1653,23 +1504,25 @@ def settings():
             original_m3u_path = f'{BASE_DIR}/files/original.m3u'
             download_m3u(form.url.data, original_m3u_path)
 
-        set_credential('url', form.url.data)
-        update_config_variable(CONFIG_PATH, 'output', form.output.data)
-        update_config_variable(CONFIG_PATH, 'maxage_before_download', form.maxage.data)
-        update_config_variable(CONFIG_PATH, 'new_group_title', form.new_group_title.data)
-        update_config_variable(CONFIG_PATH, 'movies_dir', form.movies_dir.data)
-        update_config_variable(CONFIG_PATH, 'series_dir', form.series_dir.data)
-        update_config_variable(CONFIG_PATH, 'enable_scheduler', form.enable_scheduler.data)
-        update_config_variable(CONFIG_PATH, 'scan_interval', form.scan_interval.data)
-        update_config_variable(CONFIG_PATH, 'overwrite_series', form.overwrite_series.data)
-        update_config_variable(CONFIG_PATH, 'overwrite_movies', form.overwrite_movies.data)
-        update_config_variable(CONFIG_PATH, 'hide_webserver_logs', form.hide_webserver_logs.data)
-        update_config_variable(CONFIG_PATH, 'match_type', form.match_type.data)
-        update_config_variable(CONFIG_PATH, 'jellyfin_enabled', form.jellyfin_enabled.data)
-        update_config_variable(CONFIG_PATH, 'jellyfin_url', form.jellyfin_url.data)
-        set_credential('jellyfin_api_key', form.jellyfin_api_key.data)
-        set_credential('tmdb_api_key', form.tmdb_api_key.data)
-        update_config_variable(CONFIG_PATH, 'debug', form.debug.data)
+        CONFIG.update(variables={
+            'url': encrypt_credential(form.url.data),
+            'output': form.output.data,
+            'maxage_before_download': form.maxage.data,
+            'new_group_title': form.new_group_title.data,
+            'movies_dir': form.movies_dir.data,
+            'series_dir': form.series_dir.data,
+            'enable_scheduler': form.enable_scheduler.data,
+            'scan_interval': form.scan_interval.data,
+            'overwrite_series': form.overwrite_series.data,
+            'overwrite_movies': form.overwrite_movies.data,
+            'hide_webserver_logs': form.hide_webserver_logs.data,
+            'match_type': form.match_type.data,
+            'jellyfin_enabled': form.jellyfin_enabled.data,
+            'jellyfin_url': form.jellyfin_url.data,
+            'jellyfin_api_key': encrypt_credential(form.jellyfin_api_key.data),
+            'tmdb_api_key': encrypt_credential(form.tmdb_api_key.data),
+            'debug': form.debug.data,
+        })
 
         job = scheduler.get_job('M3U Download scheduler')
         if job:
@@ -1765,6 +1618,7 @@ def restore_config():
 
     with open(CONFIG_PATH, 'w', encoding='utf-8') as cf:
         cf.write(content)
+    CONFIG.invalidate()
 
     # Re-encrypt credentials if they came in plaintext
     migrate_credentials()
@@ -1836,6 +1690,7 @@ wanted_movies = [
         os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
         with open(CONFIG_PATH, 'w', encoding='utf-8') as cf:
             cf.write(config_content)
+        CONFIG.invalidate()
 
         # Encrypt the provider URL
         set_credential('url', provider_url)
@@ -1883,6 +1738,7 @@ def setup_restore():
     os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
     with open(CONFIG_PATH, 'w', encoding='utf-8') as cf:
         cf.write(content)
+    CONFIG.invalidate()
 
     # Encrypt any plaintext credentials from the restored config
     migrate_credentials()
@@ -2156,18 +2012,10 @@ def groups():
 
     try:
         if is_cache_valid():
-            with open(CONFIG_PATH, 'r') as file:
-                config_content = file.read()
-            config_namespace = {}
-            exec(config_content, {}, config_namespace)
-            desired_group_titles = config_namespace.get('desired_group_titles', [])
+            desired_group_titles = get_config_array(CONFIG_PATH, 'desired_group_titles') or []
             return render_template('groups.html', groups=GROUPS_CACHE['groups'], desired_group_titles=desired_group_titles)
 
-        with open(CONFIG_PATH, 'r') as file:
-            config_content = file.read()
-        config_namespace = {}
-        exec(config_content, {}, config_namespace)
-        m3u_url = config_namespace.get('url')
+        m3u_url = get_credential('url')
 
         if not m3u_url:
             raise ValueError("M3U URL not found in the configuration.")
@@ -2182,7 +2030,7 @@ def groups():
 
         GROUPS_CACHE['groups'] = fetch_channel_groups(m3u_path)
         GROUPS_CACHE['last_updated'] = datetime.now()
-        desired_group_titles = config_namespace.get('desired_group_titles', [])
+        desired_group_titles = get_config_array(CONFIG_PATH, 'desired_group_titles') or []
 
     except FileNotFoundError as e:
         flash(str(e), 'danger')
@@ -2210,11 +2058,7 @@ def reorder_groups():
     desired_group_titles = []
 
     try:
-        with open(CONFIG_PATH, 'r') as file:
-            config_content = file.read()
-        config_namespace = {}
-        exec(config_content, {}, config_namespace)
-        desired_group_titles = config_namespace.get('desired_group_titles', [])
+        desired_group_titles = CONFIG.get('desired_group_titles', [])
     except Exception as e:
         flash(f"An error occurred while loading group titles: {e}", "danger")
 
@@ -2232,32 +2076,8 @@ def save_reordered_groups():
     return redirect(url_for('main_bp.reorder_groups'))
 
 def save_selected_groups(selected_groups):
-    start_marker = 'desired_group_titles = ['
-    end_marker = ']'
-
     try:
-        with open(CONFIG_PATH, 'r') as file:
-            lines = file.readlines()
-        
-        start_index = end_index = None
-        for i, line in enumerate(lines):
-            if start_marker in line:
-                start_index = i
-            elif end_marker in line and start_index is not None:
-                end_index = i
-                break
-        
-        if start_index is None or end_index is None:
-            raise ValueError("Could not locate 'desired_group_titles' list in config.py")
-        
-        del lines[start_index + 1:end_index]
-        
-        new_groups_lines = [f'    "{group}",\n' for group in sorted(selected_groups)]
-        lines[start_index + 1:start_index + 1] = new_groups_lines
-        
-        with open(CONFIG_PATH, 'w') as file:
-            file.writelines(lines)
-
+        CONFIG.update(arrays={'desired_group_titles': sorted(selected_groups)})
         return True
     except Exception as e:
         PrintLog(f"Error updating config.py: {e}", "ERROR")
@@ -2279,26 +2099,16 @@ def ansi_to_html_converter(text):
     text = ansi_escape.sub('', text)
     return text
 
-def get_log_lines(page, lines_per_page, hide_webserver_logs):
-    log_file = f'{BASE_DIR}/logs/M3Usort.log'
-    all_lines = []
-    
-    with open(log_file, 'r') as file:
-        for line in file:
-            if hide_webserver_logs == "1" and ('GET /' in line or 'POST /' in line):
-                continue
-            all_lines.append(line.strip())
-    
-    all_lines.reverse()
+def get_log_reader(hide_webserver_logs):
+    """The shared LogReader (and its line index) for one hide_webserver_logs setting."""
+    reader = LOG_READERS.get(hide_webserver_logs == "1")
+    if reader is None:
+        keep = (lambda line: not is_webserver_line(line)) if hide_webserver_logs == "1" else None
+        reader = LOG_READERS.setdefault(hide_webserver_logs == "1", LogReader(LOG_FILE, keep))
+    return reader
 
-    total_pages = len(all_lines) // lines_per_page + (1 if len(all_lines) % lines_per_page > 0 else 0)
-    
-    start_index = (page - 1) * lines_per_page
-    end_index = start_index + lines_per_page
-    
-    page_lines = all_lines[start_index:end_index]
-    
-    return page_lines, total_pages
+def get_log_lines(page, lines_per_page, hide_webserver_logs):
+    return get_log_reader(hide_webserver_logs).page(page, lines_per_page)
 
 def json_flash(message, message_type):
     data = {
@@ -2398,31 +2208,73 @@ def log():
     log_content, total_pages = get_log_lines(page, lines_per_page, hide_webserver_logs)
 
     for line in log_content:
-        parts = line.split(' ', 3)
-        if len(parts) >= 4:
-            metadata, message = parts[0] + ' ' + parts[1] + ' ' + parts[2], parts[3]
-        else:
-            metadata, message = line, ''
-
-        if 'DEBUG' in metadata:
-            css_class = 'log-debug'
-        elif 'INFO' in metadata:
-            css_class = 'log-info'
-        elif 'WARNING' in metadata:
-            css_class = 'log-warning'
-        elif 'ERROR' in metadata:
-            css_class = 'log-error'
-        elif 'CRITICAL' in metadata:
-            css_class = 'log-critical'
-        elif 'NOTICE' in metadata:
-            css_class = 'log-notice'
-        else:
-            css_class = ''
-
-        message = ansi_to_html_converter(message)        
-        log_entries.append((metadata, message, css_class))
+        log_entries.append(format_log_entry(line))
     
-    return render_template('log.html', log_entries=log_entries, current_page=page, total_pages=total_pages)
+    return render_template('log.html', log_entries=log_entries, current_page=page, total_pages=total_pages,
+                           hide_webserver_logs=hide_webserver_logs)
+
+def format_log_entry(line):
+    """Split a log line into (metadata, message as HTML, css class) for the log view."""
+    parts = line.split(' ', 3)
+    if len(parts) >= 4:
+        metadata, message = parts[0] + ' ' + parts[1] + ' ' + parts[2], parts[3]
+    else:
+        metadata, message = line, ''
+
+    if 'DEBUG' in metadata:
+        css_class = 'log-debug'
+    elif 'INFO' in metadata:
+        css_class = 'log-info'
+    elif 'WARNING' in metadata:
+        css_class = 'log-warning'
+    elif 'ERROR' in metadata:
+        css_class = 'log-error'
+    elif 'CRITICAL' in metadata:
+        css_class = 'log-critical'
+    elif 'NOTICE' in metadata:
+        css_class = 'log-notice'
+    else:
+        css_class = ''
+
+    return metadata, ansi_to_html_converter(message), css_class
+
+@main_bp.route('/log/stream')
+def log_stream():
+    """Server-Sent Events feed of new log lines as they are written.
+
+    ``level`` drops lines below that level (e.g. NOTICE, WARNING);
+    ``hide_webserver`` ("1"/"0", default: the hide_webserver_logs setting) drops
+    request lines. A reconnecting EventSource resumes after ``Last-Event-ID``
+    from the in-memory buffer.
+    """
+    level = request.args.get('level', '').upper()
+    min_level = logging.getLevelName(level) if level else logging.NOTSET
+    if not isinstance(min_level, int):
+        return jsonify({'error': f'Unknown log level: {level}'}), 400
+    hide_webserver = request.args.get('hide_webserver', get_config_variable(CONFIG_PATH, 'hide_webserver_logs')) == "1"
+    last_seq = LOG_BROADCASTER.resume_after(request.headers.get('Last-Event-ID', type=int))
+
+    def generate():
+        after = last_seq
+        yield 'retry: 3000\n\n'
+        while True:
+            entries = LOG_BROADCASTER.wait(after, timeout=LOG_STREAM_KEEPALIVE)
+            if not entries:
+                yield ': keep-alive\n\n'
+                continue
+            events = []
+            for entry in entries:
+                after = entry.seq
+                if entry.levelno < min_level or (hide_webserver and is_webserver_line(entry.line)):
+                    continue
+                metadata, message, css_class = format_log_entry(entry.line)
+                data = json.dumps({'metadata': metadata, 'message': message, 'css_class': css_class})
+                events.append(f'id: {entry.seq}\ndata: {data}\n\n')
+            # Advance the client's Last-Event-ID past filtered-out lines too
+            yield ''.join(events) if events else f'id: {after}\n\n'
+
+    return app.response_class(stream_with_context(generate()), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 def is_cache_valid():
     if not GROUPS_CACHE['last_updated']:
@@ -2467,6 +2319,10 @@ def startup_delayed():
             response = requests.get(f"{base_url}/healthcheck")
             if response.status_code == 200:
                 PrintLog("Server is up and running.", "INFO")
+                get_provider_status()
+                # Index the log once up front so the first /log view only reads its page
+                Thread(target=get_log_lines, args=(1, 1, get_config_variable(CONFIG_PATH, 'hide_webserver_logs')),
+                       daemon=True).start()
 
                 m3u_url = get_credential('url')
                 maxage_before_download = int(get_config_variable(CONFIG_PATH, 'maxage_before_download'))
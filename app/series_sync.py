@@ -0,0 +1,149 @@
+"""Concurrent series sync stage.
+
+``get_series_info`` is fetched for many series at once by a bounded pool of
+worker threads, while the calling thread writes each series' episode files as
+soon as its info arrives, so disk writes overlap with the fetches still in
+flight. Every series is timed (fetch and write separately) and the run ends
+with a summary of the totals and the slowest series.
+
+``SeriesSyncState`` remembers the provider ``last_modified`` each followed
+series had when it was last synced, so scheduled runs only fetch the series
+that changed upstream since then.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .pool import imap_bounded
+
+
+DEFAULT_WORKERS = 8
+SLOWEST_REPORTED = 5
+
+
+class SeriesSyncState:
+    """Persistent ``series_id -> last_modified`` map of the last successful sync of each series.
+
+    The map is only valid for the write ``settings`` it was recorded with
+    (e.g. ``overwrite_series``): once they change, every series counts as
+    changed and the next successful sync starts a new map.
+    """
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if not isinstance(state.get('series'), dict):
+            # Unknown or pre-settings layout: nothing counts as synced
+            return {'settings': None, 'series': {}}
+        return state
+
+    def changed(self, series, settings):
+        """Return the records of ``series`` whose last_modified differs from the last sync with ``settings``."""
+        state = self.load()
+        if state['settings'] != settings:
+            return list(series)
+        synced = state['series']
+        return [s for s in series
+                if not s.get('last_modified') or synced.get(str(s['series_id'])) != str(s['last_modified'])]
+
+    def mark_synced(self, series, settings):
+        """Record the last_modified of every record in ``series``, synced with ``settings``."""
+        with self._lock:
+            state = self.load()
+            if state['settings'] != settings:
+                state = {'settings': settings, 'series': {}}
+            for s in series:
+                if s.get('last_modified'):
+                    state['series'][str(s['series_id'])] = str(s['last_modified'])
+            tmp_path = f'{self.state_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+
+
+class SeriesTiming:
+    __slots__ = ('series_id', 'name', 'fetch_seconds', 'write_seconds', 'files_written', 'files_failed', 'error')
+
+    def __init__(self, series_id, name=None, fetch_seconds=0.0, write_seconds=0.0, files_written=0, files_failed=0,
+                 error=None):
+        self.series_id = series_id
+        self.name = name
+        self.fetch_seconds = fetch_seconds
+        self.write_seconds = write_seconds
+        self.files_written = files_written
+        self.files_failed = files_failed
+        self.error = error
+
+    @property
+    def total_seconds(self):
+        return self.fetch_seconds + self.write_seconds
+
+    @property
+    def ok(self):
+        """True if the series was fetched and every one of its episodes was written."""
+        return self.error is None and not self.files_failed
+
+
+def sync_series(series_ids, fetch_info, write_episodes, log, workers=DEFAULT_WORKERS):
+    """Fetch and write every series in ``series_ids``; returns a list of ``SeriesTiming``.
+
+    ``fetch_info(series_id)`` runs on worker threads and returns the provider
+    ``get_series_info`` payload. ``write_episodes(series_id, series_info)`` runs on the
+    calling thread and returns ``(series_name, files_written, files_failed)``. ``log`` is the
+    app's log function, called as ``log(message, level)``.
+    """
+    series_ids = list(series_ids)
+    if not series_ids:
+        return []
+
+    workers = max(1, int(workers))
+    log(f"Syncing {len(series_ids)} series ({workers} concurrent fetches)", "INFO")
+
+    def task(series_id):
+        start = time.monotonic()
+        try:
+            return series_id, fetch_info(series_id), None, time.monotonic() - start
+        except Exception as e:
+            return series_id, None, e, time.monotonic() - start
+
+    timings = []
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for series_id, series_info, error, fetch_seconds in imap_bounded(pool, task, series_ids, workers):
+            timing = SeriesTiming(series_id, fetch_seconds=fetch_seconds, error=error)
+            timings.append(timing)
+            if error is not None:
+                log(f"Error fetching series info for ID {series_id}: {error}", "ERROR")
+                continue
+            write_start = time.monotonic()
+            try:
+                timing.name, timing.files_written, timing.files_failed = write_episodes(series_id, series_info)
+            except Exception as e:
+                timing.error = e
+                log(f"Error writing episodes for series ID {series_id}: {e}", "ERROR")
+            timing.write_seconds = time.monotonic() - write_start
+
+    log_summary(timings, time.monotonic() - start, log)
+    return timings
+
+
+def log_summary(timings, elapsed, log):
+    failed = sum(1 for t in timings if not t.ok)
+    files_written = sum(t.files_written for t in timings)
+    files_failed = sum(t.files_failed for t in timings)
+    fetch_seconds = sum(t.fetch_seconds for t in timings)
+    write_seconds = sum(t.write_seconds for t in timings)
+    log(f"Series sync finished: {len(timings) - failed} series synced, {failed} failed, "
+        f"{files_written} files written ({files_failed} failed) in {elapsed:.1f}s "
+        f"(fetch {fetch_seconds:.1f}s, write {write_seconds:.1f}s cumulative)", "INFO")
+    for t in sorted(timings, key=lambda t: t.total_seconds, reverse=True)[:SLOWEST_REPORTED]:
+        log(f"  {t.name or t.series_id}: fetch {t.fetch_seconds:.2f}s, write {t.write_seconds:.2f}s, {t.files_written} files", "INFO")
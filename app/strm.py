@@ -0,0 +1,128 @@
+"""Incremental .strm writer backed by a persistent manifest.
+
+The manifest maps every .strm path M3Usort wrote to the SHA-1 of its content
+and is kept in one JSON file. A writer run only touches a file when it is
+missing or when overwriting is allowed and its URL actually changed, so
+identical files keep their mtime and Jellyfin has nothing to rescan.
+
+Existence checks are answered from one ``os.scandir`` listing per title
+directory (taken the first time the run touches it) instead of an
+``os.path.exists`` per file, and every directory is created at most once per
+run.
+"""
+import hashlib
+import json
+import os
+import threading
+
+
+WRITTEN = 'written'
+SKIPPED = 'skipped'
+UNCHANGED = 'unchanged'
+
+
+def content_hash(content):
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class StrmManifest:
+    """Process-wide view of the manifest file, loaded once and saved when dirty."""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.lock = threading.RLock()
+        self._hashes = None
+        self._dirty = False
+
+    @property
+    def hashes(self):
+        with self.lock:
+            if self._hashes is None:
+                try:
+                    with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                        self._hashes = json.load(f)
+                except (OSError, ValueError):
+                    self._hashes = {}
+            return self._hashes
+
+    def record(self, path, digest):
+        with self.lock:
+            if self.hashes.get(path) != digest:
+                self._hashes[path] = digest
+                self._dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self._dirty:
+                return
+            tmp_path = f'{self.manifest_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._hashes, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+
+    def writer(self, log=None):
+        return StrmWriter(self, log=log)
+
+
+class StrmWriter:
+    """One run's worth of .strm writes; call ``close()`` to persist the manifest."""
+
+    def __init__(self, manifest, log=None):
+        self.manifest = manifest
+        self.log = log
+        self.counts = {WRITTEN: 0, SKIPPED: 0, UNCHANGED: 0}
+        self._listings = {}
+
+    def _listing(self, directory):
+        listing = self._listings.get(directory)
+        if listing is None:
+            try:
+                with os.scandir(directory) as entries:
+                    listing = {entry.name for entry in entries}
+            except FileNotFoundError:
+                os.makedirs(directory, exist_ok=True)
+                listing = set()
+            self._listings[directory] = listing
+        return listing
+
+    def write(self, path, content, overwrite=False):
+        """Write ``content`` to ``path`` if needed; returns WRITTEN, SKIPPED or UNCHANGED."""
+        directory, name = os.path.split(path)
+        digest = content_hash(content)
+        with self.manifest.lock:
+            listing = self._listing(directory)
+            if name in listing:
+                if not overwrite:
+                    result = SKIPPED
+                elif self.manifest.hashes.get(path) == digest or self._same_on_disk(path, content):
+                    self.manifest.record(path, digest)
+                    result = UNCHANGED
+                else:
+                    result = None
+            else:
+                result = None
+
+            if result is None:
+                with open(path, 'w') as strm_file:
+                    strm_file.write(content)
+                listing.add(name)
+                self.manifest.record(path, digest)
+                result = WRITTEN
+            self.counts[result] += 1
+        return result
+
+    @staticmethod
+    def _same_on_disk(path, content):
+        try:
+            with open(path, 'r') as strm_file:
+                return strm_file.read() == content
+        except OSError:
+            return False
+
+    def close(self, label='.strm files'):
+        self.manifest.save()
+        if self.log and any(self.counts.values()):
+            self.log(f"{label}: {self.counts[WRITTEN]} written, {self.counts[UNCHANGED]} unchanged, "
+                     f"{self.counts[SKIPPED]} skipped", "INFO")
+        return self.counts
@@ -0,0 +1,136 @@
+"""Shared Xtream Codes API client.
+
+All player_api.php traffic goes through one ``requests.Session`` per provider
+URL, so connections (and TLS sessions) are kept alive and reused across calls
+instead of paying a new handshake for every request. The session retries
+transient failures with exponential backoff and every call gets a default
+(connect, read) timeout.
+
+Every request, and every long-running job, holds the client with ``lease()``.
+When the configured URL changes, ``get_client`` retires the old client: its
+session is closed at once if nothing holds it, otherwise when the last lease
+ends, so a running sync or enrichment finishes on the connections it started
+with.
+"""
+import re
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .jsonstream import iter_json_array
+
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+POOL_SIZE = 32
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _build_session(pool_size=POOL_SIZE):
+    retry = Retry(total=RETRIES, connect=RETRIES, read=RETRIES, status=RETRIES,
+                  backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=frozenset(['GET', 'HEAD']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class XtreamClient:
+    """Client for the provider behind an Xtream ``get.php`` M3U URL."""
+
+    def __init__(self, m3u_url):
+        if not m3u_url or '://' not in m3u_url or '/get.php' not in m3u_url:
+            raise ValueError("No valid M3U URL configured.")
+        scheme, rest = m3u_url.split('://', 1)
+        domain_with_port, _ = rest.split('/get.php', 1)
+        match = re.search(r'username=([^&]+)&password=([^&]+)', m3u_url)
+        self.username, self.password = match.groups() if match else (None, None)
+        if not self.username or not self.password:
+            raise ValueError("Username or password could not be extracted from the M3U URL.")
+        parsed_url = urlparse(m3u_url)
+        self.m3u_url = m3u_url
+        self.api_url = f"{scheme}://{domain_with_port}/player_api.php?username={self.username}&password={self.password}"
+        self.stream_base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        self.session = _build_session()
+        self._lock = threading.Lock()
+        self._leases = 0
+        self._retired = False
+
+    def get(self, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+        """GET an arbitrary URL on the pooled session."""
+        with self.lease():
+            return self.session.get(url, timeout=timeout, **kwargs)
+
+    def api(self, action, timeout=DEFAULT_TIMEOUT, **params):
+        """Call ``player_api.php`` and return the raw response."""
+        query = ''.join(f"&{key}={value}" for key, value in params.items())
+        return self.get(f"{self.api_url}&action={action}{query}", timeout=timeout)
+
+    def api_json(self, action, timeout=DEFAULT_TIMEOUT, **params):
+        """Call ``player_api.php``, raise on HTTP errors and return the decoded JSON."""
+        response = self.api(action, timeout=timeout, **params)
+        response.raise_for_status()
+        return response.json()
+
+    def api_stream(self, action, timeout=DEFAULT_TIMEOUT, **params):
+        """Call ``player_api.php`` and yield the elements of its JSON array response as they arrive."""
+        query = ''.join(f"&{key}={value}" for key, value in params.items())
+        with self.lease(), self.get(f"{self.api_url}&action={action}{query}", timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+    @contextmanager
+    def lease(self):
+        """Keep the session open for the duration of a job, even if the client is retired meanwhile."""
+        with self._lock:
+            self._leases += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._leases -= 1
+                idle = self._retired and not self._leases
+            if idle:
+                self.close()
+
+    def retire(self):
+        """Close the session now if no job holds a lease, otherwise when the last lease ends."""
+        with self._lock:
+            self._retired = True
+            idle = not self._leases
+        if idle:
+            self.close()
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(m3u_url):
+    """Return the shared client for ``m3u_url``, creating it on first use.
+
+    Only one client is kept: when the provider URL or credentials change, the
+    previous client is retired, so its pooled connections are released once
+    the jobs still holding it are done. Pass only the saved URL here; a
+    one-off URL should use its own request.
+    """
+    with _clients_lock:
+        client = _clients.get(m3u_url)
+        if client is None:
+            client = XtreamClient(m3u_url)
+            for stale in _clients.values():
+                stale.retire()
+            _clients.clear()
+            _clients[m3u_url] = client
+        return client
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare the legacy JSON movie cache with the compact SQLite catalogue.
+
+Generates a synthetic get_vod_streams response, stores it both ways and
+reports the disk size and the cold load time (fresh process-level objects, so
+nothing is cached in memory) of the full records, the name/id listing used by
+the library scan and the title count.
+
+    python benchmarks/catalogue_formats.py --items 60000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.catalogue import MoviesCatalogue  # noqa: E402
+
+
+WORDS = ('the', 'last', 'night', 'house', 'dark', 'river', 'king', 'love', 'war', 'city', 'blue', 'road',
+         'star', 'ghost', 'summer', 'winter', 'secret', 'game', 'wild', 'lost', 'storm', 'fire', 'iron')
+
+
+def synthetic_movies(count, rng):
+    """Records shaped like a typical Xtream get_vod_streams response."""
+    movies = []
+    for stream_id in range(1, count + 1):
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+        category_id = str(rng.randint(1, 300))
+        movies.append({
+            'num': stream_id,
+            'name': f'{name} ({rng.randint(1950, 2025)})',
+            'stream_type': 'movie',
+            'stream_id': stream_id,
+            'stream_icon': f'https://image.tmdb.org/t/p/w600_and_h900_bestv2/{rng.getrandbits(64):x}.jpg',
+            'rating': f'{rng.uniform(1, 10):.1f}',
+            'rating_5based': round(rng.uniform(0.5, 5), 1),
+            'tmdb': str(rng.randint(1, 999999)) if rng.random() < 0.7 else '',
+            'trailer': '',
+            'added': str(rng.randint(1500000000, 1760000000)),
+            'is_adult': 0,
+            'category_id': category_id,
+            'category_ids': [int(category_id)],
+            'category_name': f'Category {category_id}',
+            'container_extension': rng.choice(('mkv', 'mp4')),
+            'custom_sid': None,
+            'direct_source': '',
+        })
+    return movies
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f'  {label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the movie catalogue storage formats.')
+    parser.add_argument('--items', type=int, default=60000, help='Synthetic catalogue size (default: 60000)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    movies = synthetic_movies(args.items, random.Random(args.seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'movies_cache.json')
+        sqlite_path = os.path.join(tmp, 'movies_cache.sqlite')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(movies, f)
+        MoviesCatalogue(sqlite_path).write_stream(movies)
+        del movies
+
+        print(f'{args.items} movies')
+        print(f'  {"JSON size":<28} {os.path.getsize(json_path) / 1024 / 1024:9.1f} MB')
+        print(f'  {"SQLite size":<28} {os.path.getsize(sqlite_path) / 1024 / 1024:9.1f} MB')
+
+        print('JSON (legacy movies_cache.json)')
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        timed('full records', load_json)
+        timed('name/id listing', lambda: [{'name': m['name'], 'stream_id': m['stream_id']} for m in load_json()])
+        timed('count', lambda: len(load_json()))
+
+        print('SQLite (movies_cache.sqlite)')
+        timed('full records', lambda: MoviesCatalogue(sqlite_path).columns(*MoviesCatalogue.fields))
+        timed('full records + page views', lambda: MoviesCatalogue(sqlite_path).rows)
+        timed('name/id listing', lambda: MoviesCatalogue(sqlite_path).listing)
+        timed('count', lambda: MoviesCatalogue(sqlite_path).count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare the fuzzy scorer backends on a synthetic series catalogue.
+
+Scores every query against the whole catalogue with each available backend,
+the same way find_wanted_series_fuzzy does, and reports the time per query
+and how often the backends agree on the best match.
+
+    python benchmarks/fuzzy_scorers.py --titles 100000 --queries 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.fuzzy import BACKENDS, rf_process  # noqa: E402
+
+
+WORDS = ('the', 'of', 'and', 'a', 'house', 'dragon', 'breaking', 'bad', 'lost', 'office', 'crown', 'wire',
+         'dark', 'night', 'stranger', 'things', 'game', 'thrones', 'sopranos', 'mad', 'men', 'true',
+         'detective', 'fargo', 'chernobyl', 'succession', 'ozark', 'narcos', 'vikings', 'witcher',
+         'mandalorian', 'boys', 'expanse', 'westworld', 'lupin', 'dexter', 'sherlock', 'peaky', 'blinders',
+         'über', 'café', 'señor', 'l\'amour', 'x-files', 'star', 'trek', 'doctor', 'who', 'black', 'mirror')
+PREFIXES = ('', '', '', 'EN - ', 'NL - ', '4K - ', '[MULTI] ')
+
+
+def synthetic_titles(count, rng):
+    titles = []
+    for _ in range(count):
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))).title()
+        if rng.random() < 0.6:
+            name += f' ({rng.randint(1960, 2025)})'
+        titles.append(rng.choice(PREFIXES) + name)
+    return titles
+
+
+def best_match(scores, threshold=75):
+    best, best_score = None, 0
+    for position, score in enumerate(scores):
+        if score >= threshold and score > best_score:
+            best, best_score = position, score
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the fuzzy scorer backends.')
+    parser.add_argument('--titles', type=int, default=100000, help='Synthetic catalogue size (default: 100000)')
+    parser.add_argument('--queries', type=int, default=20, help='Number of wanted titles to score (default: 20)')
+    parser.add_argument('--metric', default='token_set_ratio', help='fuzz metric to use (default: token_set_ratio)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    titles = synthetic_titles(args.titles, rng)
+    queries = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) for _ in range(args.queries)]
+    print(f'{len(titles)} titles, {len(queries)} queries, metric {args.metric}')
+    if rf_process is None:
+        print('rapidfuzz is not installed; only the fuzzywuzzy backend is measured')
+
+    results = {}
+    for name, backend in BACKENDS.items():
+        try:
+            scorer = backend(args.metric)
+        except ImportError:
+            continue
+        start = time.perf_counter()
+        prepared = scorer.prepare(titles)
+        prepare_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        results[name] = [best_match(scorer.scores(query, prepared)) for query in queries]
+        score_seconds = time.perf_counter() - start
+        print(f'{name:>11}: prepare {prepare_seconds:7.3f}s, '
+              f'score {score_seconds / len(queries) * 1000:9.1f} ms/query, total {prepare_seconds + score_seconds:7.2f}s')
+
+    if len(results) > 1:
+        reference = results['fuzzywuzzy']
+        for name, matches in results.items():
+            if name != 'fuzzywuzzy':
+                agree = sum(1 for a, b in zip(reference, matches) if a == b)
+                print(f'{name} picks the same best match as fuzzywuzzy for {agree}/{len(queries)} queries')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    # run.py registers the NOTICE level used by PrintLog; do the same without its log file setup
+    if not hasattr(logging.Logger, 'notice'):
+        logging.NOTICE = 25
+        logging.addLevelName(logging.NOTICE, 'NOTICE')
+        logging.Logger.notice = lambda self, message, *args, **kwargs: self.log(logging.NOTICE, message, *args, **kwargs)
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def routes(flask_app):
+    from app import routes
+    with flask_app.app_context():
+        yield routes
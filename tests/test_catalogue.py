@@ -0,0 +1,136 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.catalogue import MoviesCatalogue, SeriesCatalogue
+
+
+MOVIES = [
+    {'stream_id': 1, 'name': 'Alpha', 'stream_icon': 'a.png', 'category_name': 'Drama', 'added': '300', 'tmdb': '11'},
+    {'stream_id': '2', 'name': 'Bravo', 'category_name': 'Comedy', 'added': '100', 'plot': 'B'},
+    {'stream_id': 3, 'name': 'Charlie', 'category_name': 'Drama', 'added': '200', 'rating_5based': 4},
+]
+
+
+def test_legacy_json_is_imported_once_and_renamed(tmp_path):
+    legacy = tmp_path / 'movies_cache.json'
+    legacy.write_text(json.dumps(MOVIES), encoding='utf-8')
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'), legacy_path=str(legacy))
+
+    assert catalogue.count == 3
+    assert catalogue.get('1')['tmdb_id'] == '11'
+    assert catalogue.get(2)['plot'] == 'B'
+    assert not legacy.exists()
+    assert (tmp_path / 'movies_cache.json.migrated').exists()
+
+    # Losing the SQLite file must not bring the old catalogue back
+    (tmp_path / 'movies_cache.sqlite').unlink()
+    assert MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'), legacy_path=str(legacy)).count == 0
+
+
+def test_streamed_export_matches_json_dump(tmp_path):
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    catalogue.replace(MOVIES * 50)
+
+    chunks = list(catalogue.iter_json(chunk_size=256))
+    assert len(chunks) > 1
+    assert json.loads(''.join(chunks)) == catalogue.items
+
+    empty = MoviesCatalogue(str(tmp_path / 'empty.sqlite'))
+    assert ''.join(empty.iter_json()) == '[]'
+
+
+def random_movies(rng, count):
+    now = int(time.time())
+    movies = []
+    for i in range(count):
+        movie = {'stream_id': i, 'name': f'Movie {rng.randint(0, 50)}', 'category_name': rng.choice(['Drama', 'Comedy', '']),
+                 'stream_icon': rng.choice(['', f'{i}.png'])}
+        if rng.random() < 0.8:
+            movie['added'] = str(now - rng.randint(0, 14) * 86400)
+        if rng.random() < 0.3:
+            movie[rng.choice(['tmdb', 'tmdb_id'])] = str(rng.randint(1, 999))
+        if rng.random() < 0.3:
+            movie[rng.choice(['plot', 'description', 'overview'])] = 'A plot'
+        movies.append(movie)
+    return movies
+
+
+def reference_movie_rows(movies_data):
+    """The previous /movies view, built from the whole JSON list on every request."""
+    movies = [{'name': m['name'], 'stream_id': m['stream_id'], 'stream_icon': m.get('stream_icon', ''), 'category': m.get('category_name', ''), 'tmdb_id': m.get('tmdb_id') or m.get('tmdb') or '', 'imdb_id': m.get('imdb_id') or m.get('imdb') or '', 'plot': m.get('plot') or m.get('description') or m.get('overview') or '', 'rating': m.get('rating') or m.get('rating_5based') or ''} for m in movies_data]
+    return movies, sorted(set(m['category'] for m in movies if m['category']))
+
+
+def reference_new_movies(movies_data, week_start):
+    """The previous /new movies list."""
+    new_movies = []
+    for movie in movies_data:
+        added = movie.get('added')
+        if added:
+            if datetime.fromtimestamp(int(added)).date() >= week_start:
+                new_movies.append({'name': movie['name'], 'stream_id': movie['stream_id'],
+                                   'stream_icon': movie.get('stream_icon', ''), 'added': int(added)})
+    new_movies.sort(key=lambda x: x['added'], reverse=True)
+    return new_movies
+
+
+def test_views_match_the_full_json_scan(tmp_path):
+    movies_data = random_movies(random.Random(7), 300)
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    catalogue.replace(movies_data)
+    week_start = datetime.now().date() - timedelta(days=6)
+
+    # Read back from disk, not from the snapshot replace() built
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    rows, categories = reference_movie_rows(movies_data)
+    assert catalogue.rows == rows
+    assert catalogue.categories == categories
+    assert catalogue.recent(week_start) == reference_new_movies(movies_data, week_start)
+    for movie in movies_data[::17]:
+        assert catalogue.get(movie['stream_id'])['name'] == movie['name']
+        assert catalogue.get(str(movie['stream_id']))['name'] == movie['name']
+    assert catalogue.get(10_000) is None
+
+
+def test_series_are_recent_by_last_modified(tmp_path):
+    now = int(time.time())
+    catalogue = SeriesCatalogue(str(tmp_path / 'series_cache.sqlite'))
+    catalogue.replace([
+        {'series_id': 1, 'name': 'Old', 'cover': 'o.png', 'added': str(now - 30 * 86400)},
+        {'series_id': 2, 'name': 'Updated', 'cover': 'u.png', 'added': str(now - 30 * 86400), 'last_modified': str(now)},
+        {'series_id': 3, 'name': 'New', 'added': str(now - 86400)},
+    ])
+    recent = catalogue.recent(datetime.now().date() - timedelta(days=6))
+    assert [(s['name'], s['series_cover']) for s in recent] == [('Updated', 'u.png'), ('New', '')]
+
+
+def test_save_writes_only_the_updated_rows(tmp_path, monkeypatch):
+    movies_data = random_movies(random.Random(3), 200)
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    catalogue.replace(movies_data)
+    catalogue.update_item(5, {'plot': 'Five', 'ignored': 'x'})
+    catalogue.update_item('150', {'tmdb_id': '150'})
+    assert catalogue.update_item(10_000, {'plot': 'missing'}) is False
+
+    statements = []
+    connect = catalogue._connect
+
+    def traced(*args, **kwargs):
+        connection = connect(*args, **kwargs)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    monkeypatch.setattr(catalogue, '_connect', traced)
+    catalogue.save()
+    assert len([s for s in statements if s.startswith('UPDATE')]) == 2
+    catalogue.save()
+    assert len([s for s in statements if s.startswith('UPDATE')]) == 2
+
+    reloaded = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    assert reloaded.items == catalogue.items
+    assert reloaded.get(5)['plot'] == 'Five' and 'ignored' not in reloaded.get(5)
+    assert reloaded.rows[150]['tmdb_id'] == '150'
+    assert MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite')).columns('stream_id', 'plot') == \
+        [{'stream_id': item['stream_id'], 'plot': item['plot']} for item in catalogue.items]
@@ -0,0 +1,80 @@
+import json
+import random
+
+import pytest
+
+from app.catalogue import MoviesCatalogue, SeriesCatalogue
+
+
+def reference_filter(rows, search, category):
+    """The previous client-side filterMovies() / filterSeries() over the full list."""
+    words = search.lower().split()
+    return [row for row in rows
+            if all(word in (row['name'] or '').lower() for word in words) and (not category or row['category'] == category)]
+
+
+@pytest.fixture
+def catalogues(routes, tmp_path, monkeypatch):
+    rng = random.Random(5)
+    movies = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    movies.replace([{'stream_id': i, 'name': f'{rng.choice(["The", "A", ""])} Movie {rng.randint(0, 99)}',
+                     'category_name': rng.choice(['Drama', 'Comedy']), 'added': str(1_700_000_000 + rng.randint(0, 10**6))}
+                    for i in range(400)])
+    series = SeriesCatalogue(str(tmp_path / 'series_cache.sqlite'))
+    series.replace([{'series_id': i, 'name': f'Show {i}', 'cover': f'{i}.png', 'category_name': 'Kids'} for i in range(30)])
+    monkeypatch.setattr(routes, 'MOVIES_CATALOGUE', movies)
+    monkeypatch.setattr(routes, 'SERIES_CATALOGUE', series)
+    return movies, series
+
+
+def get(flask_app, view, path, headers=None):
+    with flask_app.test_request_context(path, headers=headers or {}):
+        return flask_app.make_response(view())
+
+
+@pytest.mark.parametrize('search, category', [('', ''), ('movie 1', ''), ('THE', 'Drama'), ('  a   movie ', 'Comedy'), ('zzz', '')])
+def test_pages_match_the_client_side_filter(catalogues, search, category):
+    movies, _ = catalogues
+    expected = reference_filter(movies.rows, search, category)
+    pages = [movies.page(offset, 50, category, search) for offset in range(0, 450, 50)]
+
+    assert all(page['total'] == len(expected) for page in pages)
+    assert [item for page in pages for item in page['items']] == \
+        [{field: row[field] for field in movies.page_fields} for row in expected]
+
+    by_name = movies.page(0, 500, category, search, 'name_desc')['items']
+    assert [item['name'] for item in by_name] == sorted((row['name'] for row in expected), key=str.lower, reverse=True)
+    newest = [movies.get(item['stream_id'])['added'] for item in movies.page(0, 500, category, search, 'newest')['items']]
+    assert newest == sorted(newest, key=int, reverse=True)
+
+
+def test_api_answers_304_until_the_catalogue_changes(routes, flask_app, catalogues):
+    movies, series = catalogues
+    path = '/api/movies?offset=0&limit=5&category=Drama&q=movie'
+
+    first = get(flask_app, routes.api_movies, path)
+    assert first.status_code == 200
+    assert json.loads(first.get_data())['items'] == movies.page(0, 5, 'Drama', 'movie')['items']
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    again = get(flask_app, routes.api_movies, path, {'If-None-Match': etag})
+    assert again.status_code == 304 and again.get_data() == b''
+    assert again.headers['ETag'] == etag
+
+    # Another window, or the same one after an update, gets a new ETag
+    assert get(flask_app, routes.api_movies, path.replace('offset=0', 'offset=5'), {'If-None-Match': etag}).status_code == 200
+    movies.update_item(movies.page(0, 1, 'Drama', 'movie')['items'][0]['stream_id'], {'plot': 'changed'})
+    changed = get(flask_app, routes.api_movies, path, {'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+    series_page = get(flask_app, routes.api_series, '/api/series?limit=2')
+    assert json.loads(series_page.get_data()) == {'total': 30, 'items': [
+        {'name': 'Show 0', 'series_id': 0, 'series_cover': '0.png', 'category': 'Kids'},
+        {'name': 'Show 1', 'series_id': 1, 'series_cover': '1.png', 'category': 'Kids'}]}
+    assert get(flask_app, routes.api_series, '/api/series?limit=2', {'If-None-Match': series_page.headers['ETag']}).status_code == 304
+
+
+def test_api_rejects_bad_parameters(routes, flask_app, catalogues):
+    assert get(flask_app, routes.api_movies, '/api/movies?offset=x').status_code == 400
+    assert get(flask_app, routes.api_movies, '/api/movies?sort=random').status_code == 400
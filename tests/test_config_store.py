@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from app import config_store
+from app.config_store import ConfigStore
+
+
+CONFIG = '''# Configuration variables
+url = "http://provider/get.php"
+output = "sorted.m3u"
+debug = "no"
+
+desired_group_titles = [
+    "NL KANALEN",
+    "SPORT",
+]
+'''
+
+
+def reference_namespace(path):
+    """The previous get_config_variable: read and exec() config.py on every lookup."""
+    with open(path, 'r') as file:
+        namespace = {}
+        exec(file.read(), {}, namespace)
+    return namespace
+
+
+def reference_update(path, variables, arrays):
+    """The previous update_config_variable / update_config_array, one rewrite per change."""
+    for name, value in variables.items():
+        with open(path, 'r') as file:
+            lines = file.readlines()
+        found = False
+        with open(path, 'w') as file:
+            for line in lines:
+                if line.strip().startswith(f'{name} ='):
+                    file.write(f'{name} = "{value}"\n')
+                    found = True
+                else:
+                    file.write(line)
+            if not found:
+                file.write(f'{name} = "{value}"\n')
+    for name, values in arrays.items():
+        with open(path, 'r') as file:
+            lines = file.readlines()
+        with open(path, 'w') as file:
+            in_array = found = False
+            for line in lines:
+                if line.strip().startswith(f'{name} = ['):
+                    file.write(f'{name} = [\n' + ''.join(f'    "{value}",\n' for value in values) + ']\n')
+                    in_array = found = True
+                elif in_array and line.strip() == ']':
+                    in_array = False
+                elif not in_array:
+                    file.write(line)
+            if not found:
+                file.write(f'{name} = {values}\n')
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / 'config.py'
+    path.write_text(CONFIG)
+    return str(path)
+
+
+def test_update_matches_sequential_rewrites(config_path, tmp_path):
+    variables = {'output': 'custom.m3u', 'scan_interval': '6'}
+    arrays = {'desired_group_titles': ['MOVIES'], 'wanted_movies': ['Alpha', 'Bravo']}
+    reference_path = str(tmp_path / 'reference.py')
+    with open(reference_path, 'w') as file:
+        file.write(CONFIG)
+    reference_update(reference_path, variables, arrays)
+
+    store = ConfigStore(config_path)
+    store.update(variables=variables, arrays=arrays)
+
+    assert reference_namespace(config_path) == reference_namespace(reference_path)
+    assert {name: store.get(name) for name in reference_namespace(reference_path)} == reference_namespace(reference_path)
+    assert not os.path.exists(f'{config_path}.tmp')
+
+
+def test_external_edit_invalidates_the_cached_namespace(config_path):
+    store = ConfigStore(config_path)
+    assert store.get('debug') == 'no'
+
+    with open(config_path, 'a') as file:
+        file.write('debug = "yes"\n')
+    assert store.get('debug') == 'yes'
+
+    # Same size, only the mtime differs
+    with open(config_path, 'w') as file:
+        file.write(CONFIG.replace('"no"', '"ok"'))
+    st = os.stat(config_path)
+    os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert store.get('debug') == 'ok'
+
+
+def test_failed_update_leaves_config_untouched(config_path, monkeypatch):
+    store = ConfigStore(config_path)
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(config_store.os, 'replace', fail)
+    with pytest.raises(OSError):
+        store.update(variables={'output': 'broken.m3u'})
+    with open(config_path) as file:
+        assert file.read() == CONFIG
+    assert store.get('output') == 'sorted.m3u'
+
+
+def test_returned_lists_are_copies(config_path):
+    store = ConfigStore(config_path)
+    store.get('desired_group_titles').append('MUTATED')
+    assert store.get('desired_group_titles') == ['NL KANALEN', 'SPORT']
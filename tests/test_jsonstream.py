@@ -0,0 +1,50 @@
+import json
+import random
+
+import pytest
+
+from app.jsonstream import iter_json_array
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 5)
+    if kind == 0:
+        return rng.randint(-10**6, 10**6)
+    if kind == 1:
+        return rng.choice([0.5, -12.25e3, 1e-7, 3.0])
+    if kind == 2:
+        return ''.join(rng.choice('abc "\\/ü€😀\n,[]{}') for _ in range(rng.randint(0, 12)))
+    if kind == 3:
+        return rng.choice([True, False, None])
+    if kind == 4:
+        return rng.randint(0, 9)
+    if kind == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f'k{i}': random_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+
+
+def chunked(data, rng, max_size):
+    pos = 0
+    while pos < len(data):
+        size = rng.randint(1, max_size)
+        yield data[pos:pos + size]
+        pos += size
+
+
+@pytest.mark.parametrize('seed, max_chunk', [(1, 1), (2, 3), (3, 64), (4, 4096)])
+def test_elements_match_json_loads(seed, max_chunk):
+    rng = random.Random(seed)
+    document = [random_value(rng) for _ in range(200)]
+    for indent in (None, 2):
+        data = json.dumps(document, ensure_ascii=False, indent=indent).encode('utf-8')
+        assert list(iter_json_array(chunked(data, rng, max_chunk))) == json.loads(data)
+
+
+@pytest.mark.parametrize('data', [b'', b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1,,2]', b'[{"a": }]', b'  [1, 2,'])
+def test_invalid_documents_raise_value_error(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(data, random.Random(0), 2)))
+
+
+def test_empty_array():
+    assert list(iter_json_array([b' ', b'[', b'  ', b']'])) == []
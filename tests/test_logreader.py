@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from app.logreader import LogReader, is_webserver_line
+
+
+def reference_page(path, page, lines_per_page, hide_webserver):
+    """The previous get_log_lines: read every line, filter, reverse, slice."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if not (hide_webserver and is_webserver_line(line))]
+    lines.reverse()
+    total_pages = -(-len(lines) // lines_per_page)
+    return lines[(page - 1) * lines_per_page:page * lines_per_page], total_pages
+
+
+def append_lines(path, rng, count):
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(count):
+            roll = rng.random()
+            if roll < 0.3:
+                f.write(f'2026-01-01 10:00:00,000 INFO: 127.0.0.1 - "GET /home{i} HTTP/1.1" 200 -\n')
+            elif roll < 0.4:
+                f.write('Traceback (most recent call last):\n\n  File "x.py", line 1\n\n')
+            elif roll < 0.45:
+                f.write('\n')
+            else:
+                f.write(f'2026-01-01 10:00:00,000 INFO: line {i} ü {"x" * rng.randint(0, 200)}\n')
+
+
+@pytest.mark.parametrize('checkpoint_every, block_size', [(1000, 65536), (7, 100), (3, 17)])
+def test_pages_match_full_read_including_blank_lines(tmp_path, checkpoint_every, block_size):
+    path = str(tmp_path / 'M3Usort.log')
+    rng = random.Random(checkpoint_every)
+    append_lines(path, rng, 600)
+    readers = {hide: LogReader(path, (lambda line: not is_webserver_line(line)) if hide else None,
+                               checkpoint_every, block_size)
+               for hide in (False, True)}
+
+    for _ in range(3):
+        for hide, reader in readers.items():
+            for page in (1, 2, 3, 8, 9, 10, 50):
+                assert reader.page(page, 75) == reference_page(path, page, 75, hide)
+        append_lines(path, rng, rng.randint(1, 200))
+
+
+def test_blank_lines_are_kept(tmp_path):
+    path = tmp_path / 'M3Usort.log'
+    path.write_text('first\n\nsecond\n', encoding='utf-8')
+    assert LogReader(str(path)).page(1, 10) == (['second', '', 'first'], 1)
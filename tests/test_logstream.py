@@ -0,0 +1,72 @@
+import json
+import logging
+import threading
+
+from app.logstream import LogBroadcaster
+
+
+def make_broadcaster():
+    logger = logging.getLogger('test_logstream')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    broadcaster = LogBroadcaster()
+    logger.handlers = [broadcaster]
+    return logger, broadcaster
+
+
+def test_resume_after_clamps_ids_from_an_earlier_process():
+    logger, broadcaster = make_broadcaster()
+    for i in range(3):
+        logger.info(f'line {i}')
+
+    assert broadcaster.resume_after(None) == 3
+    assert broadcaster.resume_after(-1) == 3
+    assert broadcaster.resume_after(5000) == 3
+    assert broadcaster.resume_after(1) == 1
+    assert [entry.line.split(': ', 1)[1] for entry in broadcaster.wait(1, timeout=0)] == ['line 1', 'line 2']
+
+
+def test_log_stream_reconnect_with_stale_id_receives_new_lines(routes, flask_app, monkeypatch):
+    logger, broadcaster = make_broadcaster()
+    monkeypatch.setattr(routes, 'LOG_BROADCASTER', broadcaster)
+    logger.info('before reconnect')
+
+    # A browser reconnecting after a restart still sends the old process's last id
+    with flask_app.test_request_context('/log/stream?hide_webserver=0', headers={'Last-Event-ID': '5000'}):
+        response = routes.log_stream()
+        events = response.response
+        assert next(events) == 'retry: 3000\n\n'
+        threading.Timer(0.1, logger.warning, args=('after reconnect',)).start()
+        event = next(events)
+
+    event_id, data = event.strip().split('\n')
+    assert event_id == 'id: 2'
+    assert json.loads(data[len('data: '):])['message'] == 'after reconnect'
+
+
+def test_log_stream_filters_by_level_and_webserver_lines(routes, flask_app, monkeypatch):
+    logger, broadcaster = make_broadcaster()
+    logger.setLevel(logging.DEBUG)
+    monkeypatch.setattr(routes, 'LOG_BROADCASTER', broadcaster)
+    logger.debug('debug line')
+    logger.info('info line')
+    logger.log(logging.NOTICE, 'notice line')
+    logger.warning('warning line')
+    logger.log(logging.NOTICE, '127.0.0.1 - - "GET / HTTP/1.1" 200 -')
+    logger.error('127.0.0.1 - - "GET /home HTTP/1.1" 500 -')
+
+    with flask_app.test_request_context('/log/stream?level=NOTICE&hide_webserver=1', headers={'Last-Event-ID': '0'}):
+        response = routes.log_stream()
+        events = response.response
+        assert next(events) == 'retry: 3000\n\n'
+        batch = next(events)
+        threading.Timer(0.1, logger.info, args=('GET / filtered',)).start()
+        filtered = next(events)
+
+    sent = []
+    for event in batch.strip().split('\n\n'):
+        event_id, data = event.split('\n')
+        sent.append((event_id, json.loads(data[len('data: '):])['message']))
+    assert sent == [('id: 3', 'notice line'), ('id: 4', 'warning line')]
+    # A wake-up with nothing left after filtering still moves Last-Event-ID forward
+    assert filtered == 'id: 7\n\n'
@@ -0,0 +1,54 @@
+import json
+
+from app.m3u import is_rebuild_current, iter_m3u, rebuild_fingerprint, record_rebuild, select_channels, write_m3u
+
+
+PLAYLIST = """#EXTM3U
+#EXTINF:-1 tvg-id="npo1" group-title="NL KANALEN",NL: NPO 1
+http://example.com/1
+#EXTINF:-1 tvg-id="rtl4" group-title="NL KANALEN",NL: RTL 4
+http://example.com/4
+#EXTINF:-1 tvg-id="rtl4" group-title="NL KANALEN",NL: RTL 4
+http://example.com/4
+#EXTINF:-1 tvg-id="rtl4" group-title="NL KANALEN",NL: RTL 4
+http://example.com/4-backup
+"""
+
+
+def test_exact_duplicate_entry_is_written_once(tmp_path):
+    source = tmp_path / 'original.m3u'
+    source.write_text(PLAYLIST, encoding='utf-8')
+    output = tmp_path / 'sorted.m3u'
+
+    channels, added = select_channels(iter_m3u(str(source)), ['NL: NPO 1'], ['NL KANALEN'], 'NL Custom')
+    write_m3u(str(output), channels)
+
+    assert added == ['NL: NPO 1']
+    assert output.read_text(encoding='utf-8') == (
+        '#EXTM3U\n'
+        '#EXTINF:-1 tvg-id="npo1" group-title="NL Custom",NL: NPO 1\n'
+        'http://example.com/1\n'
+        '#EXTINF:-1 tvg-id="rtl4" group-title="NL KANALEN",NL: RTL 4\n'
+        'http://example.com/4\n'
+        '#EXTINF:-1 tvg-id="rtl4" group-title="NL KANALEN",NL: RTL 4\n'
+        'http://example.com/4-backup\n'
+    )
+
+
+def test_rebuild_is_stale_when_settings_or_playlist_change(tmp_path):
+    source = tmp_path / 'original.m3u'
+    source.write_text(PLAYLIST, encoding='utf-8')
+    meta = tmp_path / 'original.m3u.meta.json'
+    meta.write_text(json.dumps({'url': 'http://provider', 'sha256': 'aaa'}), encoding='utf-8')
+    settings = ('sorted.m3u', ['NL: NPO 1'], ['NL KANALEN'], 'NL Custom')
+
+    assert not is_rebuild_current(str(source), rebuild_fingerprint(*settings))
+    record_rebuild(str(source), rebuild_fingerprint(*settings))
+    assert is_rebuild_current(str(source), rebuild_fingerprint(*settings))
+
+    assert not is_rebuild_current(str(source), rebuild_fingerprint('sorted.m3u', ['NL: NPO 1'], ['NL KANALEN'], 'Other'))
+    assert not is_rebuild_current(str(source), rebuild_fingerprint('sorted.m3u', [], ['NL KANALEN'], 'NL Custom'))
+    assert not is_rebuild_current(str(source), rebuild_fingerprint('other.m3u', ['NL: NPO 1'], ['NL KANALEN'], 'NL Custom'))
+
+    meta.write_text(json.dumps(dict(json.loads(meta.read_text(encoding='utf-8')), sha256='bbb')), encoding='utf-8')
+    assert not is_rebuild_current(str(source), rebuild_fingerprint(*settings))
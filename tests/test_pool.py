@@ -0,0 +1,41 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.pool import imap_bounded
+
+
+def test_every_item_is_processed_with_bounded_concurrency():
+    lock = threading.Lock()
+    active = peak = 0
+
+    def square(n):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.005)
+        with lock:
+            active -= 1
+        return n * n
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(imap_bounded(pool, square, range(40), limit=3))
+
+    assert sorted(results) == [n * n for n in range(40)]
+    assert 1 <= peak <= 3
+
+
+def test_items_are_submitted_lazily():
+    submitted = []
+
+    def items():
+        for n in range(10):
+            submitted.append(n)
+            yield n
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = imap_bounded(pool, lambda n: n, items(), limit=2)
+        next(results)
+        assert len(submitted) <= 3
+        results.close()
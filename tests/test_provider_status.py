@@ -0,0 +1,93 @@
+import time
+
+from app import provider_status
+from app.provider_status import EMPTY_STATUS, ProviderStatus
+
+
+USER_INFO = {'status': 'Active', 'exp_date': str(int(time.time()) + 10 * 86400), 'is_trial': '0',
+             'active_cons': '1', 'max_connections': '2'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Provider:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def fetch(self, url):
+        self.calls += 1
+        if self.fail:
+            raise OSError('provider down')
+        return USER_INFO
+
+
+def read(status, url='http://provider/get.php'):
+    """Read the status and wait for any background refresh it started."""
+    payload = status.get(url)
+    deadline = time.time() + 1
+    while status._refreshing and time.time() < deadline:
+        time.sleep(0.001)
+    return payload
+
+
+def test_refreshes_once_per_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(provider_status.time, 'monotonic', clock.monotonic)
+    provider = Provider()
+    status = ProviderStatus(provider.fetch, log=lambda message, level: None, ttl=300)
+
+    first = read(status)
+    assert first['status'] is None and first['refreshed_at'] is None
+    assert provider.calls == 1
+
+    cached = read(status)
+    assert cached['status'] == 'Active' and cached['max_connections'] == '2' and cached['refreshed_at']
+    clock.now += 299
+    read(status)
+    assert provider.calls == 1
+
+    clock.now += 1
+    read(status)
+    assert provider.calls == 2
+
+
+def test_failed_refresh_keeps_last_value_and_retries_sooner(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(provider_status.time, 'monotonic', clock.monotonic)
+    provider = Provider()
+    logged = []
+    status = ProviderStatus(provider.fetch, log=lambda message, level: logged.append(level), ttl=300)
+    read(status)
+
+    provider.fail = True
+    clock.now += 300
+    read(status)
+    assert provider.calls == 2 and logged == ['WARNING']
+    assert read(status)['status'] == 'Active'
+
+    clock.now += provider_status.RETRY_AFTER - 1
+    read(status)
+    assert provider.calls == 2
+    clock.now += 1
+    read(status)
+    assert provider.calls == 3
+
+
+def test_url_change_drops_the_cached_status(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(provider_status.time, 'monotonic', clock.monotonic)
+    provider = Provider()
+    status = ProviderStatus(provider.fetch, log=lambda message, level: None)
+    read(status)
+    assert read(status)['status'] == 'Active'
+
+    payload = status.get(None)
+    assert {key: payload[key] for key in EMPTY_STATUS} == EMPTY_STATUS
+    assert provider.calls == 1
@@ -0,0 +1,105 @@
+from contextlib import nullcontext
+
+from app.catalogue import MoviesCatalogue, SeriesCatalogue
+from app.library import PersistentTokenIndex
+from app.series_sync import SeriesSyncState
+from app.strm import StrmManifest
+
+
+class FakeProvider:
+    username = 'u'
+    password = 'p'
+    stream_base_url = 'http://provider'
+
+    def __init__(self):
+        self.last_modified = '100'
+        self.episodes = 1
+        self.broken = set()
+        self.fetches = 0
+
+    def lease(self):
+        return nullcontext(self)
+
+    def api_json(self, action, **params):
+        if action in ('get_vod_categories', 'get_series_categories'):
+            return [{'category_id': 1, 'category_name': 'Drama'}]
+        assert action == 'get_series_info' and str(params['series_id']) == '7'
+        self.fetches += 1
+        return {'info': {'name': 'Show A'},
+                'episodes': {'1': [{'id': 70 + n, 'episode_num': 'bad' if n in self.broken else n, 'season': 1, 'title': f'E{n}'}
+                                   for n in range(1, self.episodes + 1)]}}
+
+    def api_stream(self, action, **params):
+        if action == 'get_series':
+            return iter([{'series_id': 7, 'name': 'Show A', 'category_id': '1', 'last_modified': self.last_modified}])
+        return iter([])
+
+
+def install_fakes(routes, tmp_path, monkeypatch, provider, config):
+    movies = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    monkeypatch.setattr(routes, 'MOVIES_CATALOGUE', movies)
+    monkeypatch.setattr(routes, 'MOVIES_TOKEN_INDEX', PersistentTokenIndex(str(tmp_path / 'index.json'), movies))
+    monkeypatch.setattr(routes, 'SERIES_CATALOGUE', SeriesCatalogue(str(tmp_path / 'series_cache.sqlite')))
+    monkeypatch.setattr(routes, 'SERIES_SYNC_STATE', SeriesSyncState(str(tmp_path / 'series_sync_state.json')))
+    monkeypatch.setattr(routes, 'STRM_MANIFEST', StrmManifest(str(tmp_path / 'strm_manifest.json')))
+    monkeypatch.setattr(routes, 'get_config_variable', lambda path, name: config.get(name))
+    monkeypatch.setattr(routes, 'get_xtream_client', lambda: provider)
+    for step in ('find_wanted_series', 'update_movies_directory', 'find_wanted_movies', 'enrich_vod_cache', 'refresh_jellyfin'):
+        monkeypatch.setattr(routes, step, lambda *args, **kwargs: None)
+
+
+def test_changed_series_is_synced_in_the_same_run(routes, tmp_path, monkeypatch):
+    series_dir = tmp_path / 'Series'
+    (series_dir / 'Show A').mkdir(parents=True)
+    config = {'series_dir': str(series_dir), 'overwrite_series': '0', 'series_sync_workers': '2'}
+    provider = FakeProvider()
+    install_fakes(routes, tmp_path, monkeypatch, provider, config)
+
+    routes.scheduled_vod_download()
+    assert sorted(p.name for p in (series_dir / 'Show A').iterdir()) == ['Show A S01E01.strm']
+
+    # A new episode upstream bumps last_modified; the next run must pick it up
+    provider.last_modified = '200'
+    provider.episodes = 2
+    routes.scheduled_vod_download()
+    assert sorted(p.name for p in (series_dir / 'Show A').iterdir()) == ['Show A S01E01.strm', 'Show A S01E02.strm']
+
+
+def test_series_with_failed_episodes_is_retried(routes, tmp_path, monkeypatch):
+    series_dir = tmp_path / 'Series'
+    (series_dir / 'Show A').mkdir(parents=True)
+    config = {'series_dir': str(series_dir), 'overwrite_series': '0', 'series_sync_workers': '2'}
+    provider = FakeProvider()
+    provider.episodes = 2
+    provider.broken = {2}
+    install_fakes(routes, tmp_path, monkeypatch, provider, config)
+
+    routes.scheduled_vod_download()
+    assert sorted(p.name for p in (series_dir / 'Show A').iterdir()) == ['Show A S01E01.strm']
+
+    # Same last_modified, but the failed episode must not be recorded as synced
+    provider.broken = set()
+    routes.scheduled_vod_download()
+    assert sorted(p.name for p in (series_dir / 'Show A').iterdir()) == ['Show A S01E01.strm', 'Show A S01E02.strm']
+
+    fetches = provider.fetches
+    routes.scheduled_vod_download()
+    assert provider.fetches == fetches
+
+
+def test_overwrite_setting_change_resyncs_every_series(routes, tmp_path, monkeypatch):
+    series_dir = tmp_path / 'Series'
+    (series_dir / 'Show A').mkdir(parents=True)
+    config = {'series_dir': str(series_dir), 'overwrite_series': '0', 'series_sync_workers': '2'}
+    provider = FakeProvider()
+    install_fakes(routes, tmp_path, monkeypatch, provider, config)
+
+    routes.scheduled_vod_download()
+    routes.scheduled_vod_download()
+    assert provider.fetches == 1
+
+    config['overwrite_series'] = '1'
+    routes.scheduled_vod_download()
+    assert provider.fetches == 2
+    routes.scheduled_vod_download()
+    assert provider.fetches == 2
@@ -0,0 +1,68 @@
+import os
+import random
+
+from app.strm import SKIPPED, UNCHANGED, WRITTEN, StrmManifest
+
+
+def reference_write(path, content, overwrite):
+    """The previous process_episode(): write when missing or whenever overwriting is on."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path) or overwrite:
+        with open(path, 'w') as strm_file:
+            strm_file.write(content)
+
+
+def snapshot(root):
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path) as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+def test_files_match_the_old_writer_but_unchanged_files_are_not_rewritten(tmp_path):
+    rng = random.Random(11)
+    new_root, old_root = tmp_path / 'new', tmp_path / 'old'
+    manifest_path = str(tmp_path / 'strm_manifest.json')
+
+    for run in range(6):
+        # Each run uses a fresh manifest object, as after a restart
+        writer = StrmManifest(manifest_path).writer()
+        overwrite = rng.random() < 0.5
+        mtimes = {}
+        for _ in range(60):
+            relative = os.path.join(f'Show {rng.randint(0, 4)}', f'E{rng.randint(0, 9)}.strm')
+            content = f'http://provider/series/u/p/{rng.randint(0, 2)}.mkv'
+            path = str(new_root / relative)
+            before = snapshot(new_root).get(relative)
+            if os.path.exists(path):
+                mtimes[path] = os.stat(path).st_mtime_ns
+            result = writer.write(path, content, overwrite=overwrite)
+            reference_write(str(old_root / relative), content, overwrite)
+
+            if before is None:
+                assert result == WRITTEN
+            elif not overwrite:
+                assert result == SKIPPED
+            elif before == content:
+                assert result == UNCHANGED
+                assert os.stat(path).st_mtime_ns == mtimes[path]
+            else:
+                assert result == WRITTEN
+        writer.close()
+        assert snapshot(new_root) == snapshot(old_root)
+
+
+def test_manifest_is_saved_only_when_changed(tmp_path):
+    manifest = StrmManifest(str(tmp_path / 'strm_manifest.json'))
+    writer = manifest.writer()
+    writer.write(str(tmp_path / 'Show' / 'E1.strm'), 'a', overwrite=True)
+    assert writer.close() == {WRITTEN: 1, SKIPPED: 0, UNCHANGED: 0}
+    saved = os.stat(tmp_path / 'strm_manifest.json').st_mtime_ns
+
+    writer = StrmManifest(str(tmp_path / 'strm_manifest.json')).writer()
+    assert writer.write(str(tmp_path / 'Show' / 'E1.strm'), 'a', overwrite=True) == UNCHANGED
+    writer.close()
+    assert os.stat(tmp_path / 'strm_manifest.json').st_mtime_ns == saved
@@ -0,0 +1,65 @@
+import random
+
+from app import library
+from app.catalogue import MoviesCatalogue
+from app.library import PersistentTokenIndex
+from app.normalize import strip_year, tokenize
+
+
+WORDS = ['the', 'dark', 'knight', 'night', 'of', 'living', 'dead', 'star', 'wars', 'ii', 'amélie', 'x-men']
+
+
+def random_movies(rng, count):
+    movies = []
+    for i in range(count):
+        name = ' '.join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.5:
+            name += f' ({rng.randint(1950, 2025)})'
+        movies.append({'stream_id': i, 'name': name})
+    return movies
+
+
+def reference_candidates(movies, title):
+    """Every movie whose stripped name contains all words of ``title``, in catalogue order."""
+    tokens = tokenize(title)
+    result = []
+    for movie in movies:
+        stripped, year = strip_year(movie['name'])
+        if set(tokens) <= set(tokenize(stripped)):
+            result.append(({'name': movie['name'], 'stream_id': movie['stream_id']}, stripped, year))
+    return result
+
+
+def test_candidates_match_a_full_scan(tmp_path):
+    rng = random.Random(4)
+    movies = random_movies(rng, 500)
+    catalogue = MoviesCatalogue(str(tmp_path / 'movies_cache.sqlite'))
+    catalogue.replace(movies)
+    index = PersistentTokenIndex(str(tmp_path / 'movies_token_index.json'), catalogue).get()
+
+    for title in ['', 'dark', 'The Dark Knight', 'star wars ii', 'AMÉLIE', 'x-men', 'unknown', 'night of the living dead']:
+        assert index.candidates(title) == reference_candidates(movies, title)
+
+
+def test_index_is_reused_from_disk_and_rebuilt_when_the_catalogue_changes(tmp_path, monkeypatch):
+    builds = []
+    build = library.TokenIndex.build.__func__
+    monkeypatch.setattr(library.TokenIndex, 'build', classmethod(lambda cls, *args: builds.append(1) or build(cls, *args)))
+
+    cache_path, index_path = str(tmp_path / 'movies_cache.sqlite'), str(tmp_path / 'movies_token_index.json')
+    movies = random_movies(random.Random(8), 100)
+    MoviesCatalogue(cache_path).replace(movies)
+    PersistentTokenIndex(index_path, MoviesCatalogue(cache_path)).rebuild()
+    assert len(builds) == 1
+
+    # A restart loads the saved index instead of rebuilding it
+    restarted = PersistentTokenIndex(index_path, MoviesCatalogue(cache_path))
+    assert restarted.get().candidates('dark') == reference_candidates(movies, 'dark')
+    assert restarted.get() is restarted.get()
+    assert len(builds) == 1
+
+    # A cache replaced behind its back no longer matches the fingerprint
+    movies[0]['name'] = 'Dark Wars'
+    MoviesCatalogue(cache_path).replace(movies)
+    assert restarted.get().candidates('dark wars') == reference_candidates(movies, 'dark wars')
+    assert len(builds) == 2
@@ -0,0 +1,26 @@
+from app import xtream
+
+
+def test_replaced_client_is_closed_only_after_its_last_lease(monkeypatch):
+    monkeypatch.setattr(xtream, '_clients', {})
+    old = xtream.get_client('http://provider/get.php?username=a&password=b')
+    closed = []
+    monkeypatch.setattr(old, 'close', lambda: closed.append(old))
+
+    assert xtream.get_client('http://provider/get.php?username=a&password=b') is old
+    with old.lease():
+        with old.lease():
+            new = xtream.get_client('http://provider/get.php?username=c&password=d')
+            assert new is not old
+        assert closed == []
+    assert closed == [old]
+
+
+def test_idle_client_is_closed_when_replaced(monkeypatch):
+    monkeypatch.setattr(xtream, '_clients', {})
+    old = xtream.get_client('http://provider/get.php?username=a&password=b')
+    closed = []
+    monkeypatch.setattr(old, 'close', lambda: closed.append(old))
+
+    xtream.get_client('http://provider/get.php?username=c&password=d')
+    assert closed == [old]